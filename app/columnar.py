@@ -0,0 +1,230 @@
+import os
+import sys
+import mmap
+import struct
+from array import array
+from bisect import bisect_left
+
+from .records import Company
+
+# 컬럼형 검색 인덱스 파일 (search_index.bin) 형식 - 모두 리틀 엔디언
+#
+#   헤더      : magic(8s) count(I) category_count(I) blob_len(Q)
+#   카테고리  : category_count 개의 (길이(H) + UTF-8 바이트), 4바이트 정렬 패딩
+#   s         : int32  * count          (보조금 건수)
+#   c         : uint8  * count          (카테고리 코드), 4바이트 정렬 패딩
+#   offsets   : uint32 * (필드 수 * count + 1)   (문자열 테이블 내 시작 위치, 필드 우선 배치)
+#   file_order: uint32 * count          (file 기준 정렬 순서, 이진 탐색용)
+#   id_order  : uint32 * count          (id 기준 정렬 순서, 이진 탐색용)
+#   blob      : 모든 문자열을 이어 붙인 UTF-8 바이트
+#
+# 파일을 mmap 으로 열기 때문에 여러 uvicorn 워커가 같은 페이지 캐시를 공유하며,
+# 레코드는 접근할 때만 디코딩합니다.
+MAGIC = b"CDBCOL01"
+HEADER = struct.Struct("<8sIIQ")
+FIELDS = ("id", "file", "n", "en", "l", "n_lower", "en_lower")
+ID, FILE, N, EN, L, N_LOWER, EN_LOWER = range(len(FIELDS))
+
+
+def _pad4(n):
+    return (4 - n % 4) % 4
+
+
+def write_columnar(path, records):
+    """인덱스 레코드(dict) 목록을 컬럼형 파일로 씁니다. (임시 파일에 쓴 뒤 교체)"""
+    count = len(records)
+    categories = sorted({str(r.get('c', 'Services')) for r in records})
+    category_codes = {c: i for i, c in enumerate(categories)}
+    if len(categories) > 255:
+        raise ValueError("카테고리가 너무 많습니다 (최대 255개)")
+
+    columns = [[] for _ in FIELDS]
+    for r in records:
+        n, en = str(r.get('n', '')), str(r.get('en', ''))
+        values = (str(r.get('id', '')), str(r.get('file', '')), n, en, str(r.get('l', '')), n.lower(), en.lower())
+        for col, value in zip(columns, values):
+            col.append(value.encode('utf-8'))
+
+    offsets = array('I', [0])
+    blob_parts = []
+    position = 0
+    for col in columns:
+        for value in col:
+            blob_parts.append(value)
+            position += len(value)
+            offsets.append(position)
+
+    files, ids = columns[FILE], columns[ID]
+    file_order = array('I', sorted(range(count), key=lambda i: files[i].decode('utf-8')))
+    id_order = array('I', sorted(range(count), key=lambda i: ids[i].decode('utf-8')))
+    subsidies = array('i', [int(r.get('s', 0) or 0) for r in records])
+    codes = bytes(category_codes[str(r.get('c', 'Services'))] for r in records)
+
+    for arr in (offsets, file_order, id_order, subsidies):
+        if sys.byteorder != 'little':
+            arr.byteswap()
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, count, len(categories), position))
+        cat_bytes = b"".join(struct.pack("<H", len(c.encode('utf-8'))) + c.encode('utf-8') for c in categories)
+        f.write(cat_bytes + b"\0" * _pad4(HEADER.size + len(cat_bytes)))
+        f.write(subsidies.tobytes())
+        f.write(codes + b"\0" * _pad4(count))
+        f.write(offsets.tobytes())
+        f.write(file_order.tobytes())
+        f.write(id_order.tobytes())
+        for part in blob_parts:
+            f.write(part)
+    os.replace(tmp_path, path)
+
+
+def columnar_size(count, category_bytes, blob_len):
+    """헤더 값으로 계산한 컬럼형 파일의 전체 크기 (바이트)."""
+    pos = HEADER.size + category_bytes
+    pos += _pad4(pos)
+    pos += 4 * count + count + _pad4(count)
+    pos += 4 * (len(FIELDS) * count + 1) + 8 * count
+    return pos + blob_len
+
+
+def is_columnar(path):
+    """path 가 완전한 컬럼형 인덱스 파일인지 헤더만 읽어 확인합니다. (magic, 파일 길이)"""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                return False
+            magic, count, category_count, blob_len = HEADER.unpack(header)
+            if magic != MAGIC:
+                return False
+            category_bytes = 0
+            for _ in range(category_count):
+                length = f.read(2)
+                if len(length) < 2:
+                    return False
+                (length,) = struct.unpack("<H", length)
+                f.seek(length, os.SEEK_CUR)
+                category_bytes += 2 + length
+            return os.fstat(f.fileno()).st_size == columnar_size(count, category_bytes, blob_len)
+    except OSError:
+        return False
+
+
+class _FieldView:
+    """정렬 순서 배열을 통해 특정 필드 문자열을 보여주는 시퀀스 (bisect 용)."""
+
+    def __init__(self, table, order, field):
+        self.table, self.order, self.field = table, order, field
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, k):
+        return self.table.get_str(self.field, self.order[k])
+
+
+class _LoweredNames:
+    """레코드 번호 -> (소문자 일본어명, 소문자 영문명). NgramIndex 의 검증용."""
+
+    def __init__(self, table):
+        self.table = table
+
+    def __len__(self):
+        return len(self.table)
+
+    def __getitem__(self, i):
+        return self.table.get_str(N_LOWER, i), self.table.get_str(EN_LOWER, i)
+
+
+class ColumnarTable:
+    """mmap 으로 연 컬럼형 인덱스. 리스트처럼 인덱싱하면 Company 를 돌려줍니다."""
+
+    def __init__(self, path):
+        if sys.byteorder != 'little':
+            raise RuntimeError("컬럼형 인덱스는 리틀 엔디언 환경에서만 지원합니다")
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        mm = self._mm
+        magic, count, category_count, blob_len = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"컬럼형 인덱스 형식이 아닙니다: {path}")
+
+        pos = HEADER.size
+        categories = []
+        for _ in range(category_count):
+            (length,) = struct.unpack_from("<H", mm, pos)
+            categories.append(sys.intern(mm[pos + 2:pos + 2 + length].decode('utf-8')))
+            pos += 2 + length
+        pos += _pad4(pos)
+
+        view = memoryview(mm)
+        self.subsidies = view[pos:pos + 4 * count].cast('i')
+        pos += 4 * count
+        self._codes = view[pos:pos + count]
+        pos += count + _pad4(count)
+        n_offsets = len(FIELDS) * count + 1
+        self._offsets = view[pos:pos + 4 * n_offsets].cast('I')
+        pos += 4 * n_offsets
+        self._file_order = view[pos:pos + 4 * count].cast('I')
+        pos += 4 * count
+        self._id_order = view[pos:pos + 4 * count].cast('I')
+        pos += 4 * count
+        self._blob_start = pos
+        if pos + blob_len > len(mm):
+            raise ValueError(f"컬럼형 인덱스 파일이 잘렸습니다: {path}")
+
+        self.count = count
+        self.categories = categories
+        self.lowered_names = _LoweredNames(self)
+
+    def __len__(self):
+        return self.count
+
+    def prefetch(self):
+        """파일 전체를 미리 페이지 캐시로 읽어 두도록 커널에 요청합니다. (첫 요청의 페이지 폴트 방지)"""
+        if hasattr(self._mm, "madvise") and hasattr(mmap, "MADV_WILLNEED"):
+            self._mm.madvise(mmap.MADV_WILLNEED)
+
+    def get_str(self, field, i):
+        k = field * self.count + i
+        start = self._blob_start
+        return self._mm[start + self._offsets[k]:start + self._offsets[k + 1]].decode('utf-8')
+
+    def _get(self, i):
+        get_str = self.get_str
+        return Company(
+            id=get_str(ID, i),
+            file=get_str(FILE, i),
+            n=get_str(N, i),
+            en=get_str(EN, i),
+            l=get_str(L, i),
+            s=self.subsidies[i],
+            c=self.categories[self._codes[i]],
+        )
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._get(k) for k in range(*i.indices(self.count))]
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("record index out of range")
+        return self._get(i)
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self._get(i)
+
+    def _find(self, order, field, value):
+        view = _FieldView(self, order, field)
+        k = bisect_left(view, value)
+        if k < len(view) and view[k] == value:
+            return self._get(order[k])
+        return None
+
+    def find_file(self, file):
+        return self._find(self._file_order, FILE, file)
+
+    def find_id(self, company_id):
+        return self._find(self._id_order, ID, company_id)
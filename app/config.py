@@ -1,21 +1,73 @@
 import os
 
 # 기본 경로 설정
+# (데이터/콘텐츠/사이트맵 경로는 환경 변수로 바꿀 수 있음 - 벤치마크 등 별도 카탈로그용)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATA_DIR = os.path.join(BASE_DIR, "data")
-CONTENT_DIR = os.path.join(BASE_DIR, "app", "content")
+DATA_DIR = os.getenv("COMPANYDB_DATA_DIR", os.path.join(BASE_DIR, "data"))
+CONTENT_DIR = os.getenv("COMPANYDB_CONTENT_DIR", os.path.join(BASE_DIR, "app", "content"))
 STATIC_DIR = os.path.join(BASE_DIR, "app", "static")
 TEMPLATE_DIR = os.path.join(BASE_DIR, "app", "templates")
 
 # 데이터 파일 경로
 CSV_PATH = os.path.join(DATA_DIR, "Total_Premium_Japan_SMEs.csv")
 INDEX_PATH = os.path.join(DATA_DIR, "search_index.json")
-SITEMAP_PATH = os.path.join(STATIC_DIR, "sitemap.xml")
+# 서버가 mmap 으로 읽는 컬럼형 인덱스 (JSON 은 내보내기용으로 유지)
+INDEX_BIN_PATH = os.path.join(DATA_DIR, "search_index.bin")
+# 증분 인덱싱용 매니페스트 (파일명 -> mtime, size, 추출한 인덱스 레코드)
+INDEX_MANIFEST_PATH = os.path.join(DATA_DIR, "index_manifest.json")
+# 사이트맵 인덱스 (sitemap-1.xml, sitemap-2.xml ... 샤드 목록)
+SITEMAP_DIR = os.getenv("COMPANYDB_SITEMAP_DIR", STATIC_DIR)
+SITEMAP_PATH = os.path.join(SITEMAP_DIR, "sitemap_index.xml")
+# 빌드 시 미리 변환한 리포트 HTML 조각 및 메타데이터 (build_data.py render)
+RENDERED_DIR = os.path.join(DATA_DIR, "rendered")
+RENDER_MANIFEST_PATH = os.path.join(RENDERED_DIR, "manifest.json")
+# 정적 사이트 내보내기 결과 (build_data.py export, /search 외 모든 페이지를 HTML 파일로)
+EXPORT_DIR = os.path.join(DATA_DIR, "export")
+EXPORT_MANIFEST_PATH = os.path.join(DATA_DIR, "export_manifest.json")
 
 # 서비스 설정
 DOMAIN = "https://companydb.net"
 DAILY_LIMIT = 300
 
+# 사이트맵 샤드당 최대 URL 수 (프로토콜 상한 50,000) 및 gzip 출력 여부
+SITEMAP_MAX_URLS = 50000
+SITEMAP_GZIP = True
+
+# 인덱스 파일 변경 확인 주기 (초). 이 간격마다 mtime/size 만 확인하여 핫 리로드
+INDEX_RELOAD_INTERVAL = 5.0
+
+# 검색 결과 페이지 크기 (기본값 / 요청 가능한 최대값)
+SEARCH_PAGE_SIZE = 30
+SEARCH_MAX_LIMIT = 100
+
+# 상세 페이지 변환 결과 캐시 (LRU, 항목 수와 대략적인 메모리 사용량으로 제한)
+RENDER_CACHE_MAX_ENTRIES = 2000
+RENDER_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# 서버 시작 시 미리 변환해 둘 최신 기업 수 (0 이면 사용 안 함, 기본값)
+# 콜드 스타트 직후 첫 요청들과 CPU 를 다투므로 필요할 때만 환경 변수로 켬
+RENDER_CACHE_PREWARM = int(os.getenv("RENDER_CACHE_PREWARM", "0"))
+
+# 허브/검색 페이지를 템플릿 generate() 로 나눠 보내는 스트리밍 응답의 조각 크기 (문자 수)
+STREAM_CHUNK_SIZE = 32 * 1024
+# 기업 수가 이 값 이상인 카테고리 허브는 첫 글자 그룹만 싣고 A-Z 메뉴를 글자별 페이지
+# (/category/{slug}/{letter}) 로 연결하여 응답 크기를 제한 (0 이면 한 페이지에 모두 표시)
+HUB_LETTER_PAGES_MIN = 0
+
+# /metrics 지연 히스토그램 버킷 (초)
+METRICS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# 응답에 Server-Timing 헤더(단계별 소요 시간)를 붙일지 여부
+METRICS_SERVER_TIMING = os.getenv("METRICS_SERVER_TIMING", "0") == "1"
+
+# 라우트별 Cache-Control (CDN/크롤러 캐시 수명)
+CACHE_CONTROL = {
+    "home": "public, max-age=300",
+    "search": "public, max-age=60",
+    "hub": "public, max-age=3600",
+    "company": "public, max-age=86400",
+    "page": "public, max-age=86400",
+    "sitemap": "public, max-age=3600",
+}
+
 # 카테고리 정의 (AI 생성 및 웹 필터링 공통 사용)
 CATEGORIES = [
     "Manufacturing", "Technology", "Electronics", 
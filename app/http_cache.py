@@ -0,0 +1,44 @@
+import os
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+
+
+def get_template_version(template_dir):
+    """템플릿 파일들의 최신 mtime. 배포로 템플릿이 바뀌면 검증자(ETag)도 바뀌도록 함."""
+    latest = 0.0
+    for name in os.listdir(template_dir):
+        latest = max(latest, os.path.getmtime(os.path.join(template_dir, name)))
+    return latest
+
+
+def build_cache_headers(cache_control, version, last_modified):
+    """ETag / Last-Modified / Cache-Control 헤더를 만듭니다.
+
+    version 은 응답 내용을 결정하는 값(인덱스 스냅샷 버전, 파일 mtime 등)의 문자열이고,
+    last_modified 는 유닉스 타임스탬프입니다.
+    """
+    etag = '"' + hashlib.sha1(str(version).encode('utf-8')).hexdigest()[:20] + '"'
+    return {
+        "ETag": etag,
+        "Last-Modified": formatdate(int(last_modified), usegmt=True),
+        "Cache-Control": cache_control,
+    }
+
+
+def is_not_modified(request, headers):
+    """If-None-Match / If-Modified-Since 를 확인하여 304 로 응답해도 되는지 반환합니다."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match 가 있으면 If-Modified-Since 는 무시 (RFC 9110)
+        tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+        return "*" in tags or headers["ETag"] in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        modified = parsedate_to_datetime(headers["Last-Modified"]).timestamp()
+        return modified <= since
+    return False
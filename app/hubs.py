@@ -0,0 +1,132 @@
+import re
+from array import array
+from collections import Counter
+
+from .config import HUB_DATA
+
+# 주소 앞부분에서 도도부현 이름 추출 (神奈川県, 和歌山県 등 3글자 + 県 포함)
+PREFECTURE_RE = re.compile(r'^(北海道|東京都|京都府|大阪府|.{2,3}?県)')
+
+# 도도부현 다음에 오는 시구정촌 이름 추출 (지역 허브의 상위 지역 표시용)
+CITY_RE = re.compile(r'^(.+?[市区町村])')
+
+
+def get_prefecture(address):
+    m = PREFECTURE_RE.match(address or "")
+    return m.group(1) if m else ""
+
+
+def get_city(address):
+    address = address or ""
+    rest = address[len(get_prefecture(address)):]
+    m = CITY_RE.match(rest)
+    return m.group(1) if m else ""
+
+
+# 정렬 및 그룹화를 위한 안전한 키 추출 함수 (일본어 강제 매핑)
+def get_safe_char(company):
+    name = company.en or company.n or "Unknown"
+    first_char = name.strip()[0].upper() if name.strip() else "A"
+
+    # 1. 영문자이면 그대로 반환
+    if 'A' <= first_char <= 'Z':
+        return first_char
+
+    # 2. 영문자가 아닌 경우(일본어 등) 아스키 코드 합산 후 나머지 연산으로 A~Z 매핑
+    char_code = sum(ord(c) for c in first_char)
+    mapped_char = chr(ord('A') + (char_code % 26))
+    return mapped_char
+
+
+def get_sort_name(company):
+    return (company.en or company.n or "Unknown").strip().upper()
+
+
+class RecordView:
+    """레코드 번호 목록을 통해 테이블의 레코드를 순회하는 가벼운 뷰 (템플릿 반복용)."""
+
+    def __init__(self, records, ids):
+        self.records = records
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        records = self.records
+        for i in self.ids:
+            yield records[i]
+
+
+class HubPage:
+    """허브 페이지 하나의 렌더링용 데이터 (스냅샷마다 한 번 계산).
+
+    레코드 자체 대신 레코드 번호만 보관하므로, 컬럼형(mmap) 테이블에서는
+    렌더링할 때만 레코드를 디코딩합니다.
+    """
+
+    def __init__(self, records, companies, ids, location_key=get_prefecture, top_n=3):
+        ordered = sorted(ids, key=lambda i: get_sort_name(companies[i]))
+
+        groups = {}
+        for i in ordered:
+            groups.setdefault(get_safe_char(companies[i]), array('i')).append(i)
+
+        self.grouped_results = {letter: RecordView(records, group) for letter, group in groups.items()}
+        self.alphabet = sorted(groups.keys())
+        self.total_count = len(ordered)
+        self.total_subsidies = sum(companies[i].s for i in ordered)
+        self.top_locations = Counter(
+            p for p in (location_key(companies[i].l) for i in ordered) if p
+        ).most_common(top_n)
+
+
+def build_category_hubs(records, companies):
+    """HUB_DATA["categories"] 의 모든 카테고리에 대해 HubPage 를 미리 만듭니다."""
+    buckets = {}
+    for i, company in enumerate(companies):
+        buckets.setdefault(company.c.lower(), []).append(i)
+
+    return {
+        slug: HubPage(records, companies, buckets.get(info["name"].lower(), []))
+        for slug, info in HUB_DATA["categories"].items()
+    }
+
+
+def build_prefecture_index(companies):
+    """도도부현 이름 -> 레코드 번호 목록 색인을 만듭니다."""
+    index = {}
+    for i, company in enumerate(companies):
+        prefecture = get_prefecture(company.l)
+        if prefecture:
+            index.setdefault(prefecture, array('i')).append(i)
+    return index
+
+
+def build_location_hubs(records, companies, prefecture_index):
+    """HUB_DATA["locations"] 의 지역별, 지역+카테고리별 HubPage 를 미리 만듭니다.
+
+    반환값의 키는 (location_slug, None) 또는 (location_slug, category_slug) 입니다.
+    """
+    categories = {info["name"].lower(): slug for slug, info in HUB_DATA["categories"].items()}
+    hubs = {}
+    for loc_slug, loc_info in HUB_DATA["locations"].items():
+        ids = sorted(
+            i
+            for prefecture, plist in prefecture_index.items()
+            if prefecture.startswith(loc_info["term"])
+            for i in plist
+        )
+
+        by_category = {}
+        for i in ids:
+            cat_slug = categories.get(companies[i].c.lower())
+            if cat_slug:
+                by_category.setdefault(cat_slug, []).append(i)
+
+        hubs[(loc_slug, None)] = HubPage(records, companies, ids, location_key=get_city)
+        for cat_slug in HUB_DATA["categories"]:
+            hubs[(loc_slug, cat_slug)] = HubPage(
+                records, companies, by_category.get(cat_slug, []), location_key=get_city
+            )
+    return hubs
@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import threading
+from datetime import datetime
+
+from .records import ListTable, to_company
+from .columnar import ColumnarTable, is_columnar
+from .search_index import NgramIndex
+from .hubs import build_category_hubs, build_prefecture_index, build_location_hubs
+from .metrics import timed
+
+
+class IndexSnapshot:
+    """특정 시점의 검색 인덱스. 한 번 만들어지면 변경하지 않습니다."""
+
+    def __init__(self, records, signature=None):
+        self.records = records
+        self.signature = signature
+        self.total_count = len(records)
+        self.latest = records[-8:][::-1] if records else []
+
+        # 단계별 구축 시간(ms) - 기동 시간 로그용
+        self.timings = {}
+        started = time.perf_counter()
+
+        # 색인 구축 동안만 쓰는 디코딩된 레코드 목록 (색인에는 레코드 번호만 보관)
+        companies = records if isinstance(records, list) else list(records)
+        self.timings["decode"] = (time.perf_counter() - started) * 1000
+        # 회사명 검색용 n-gram 역색인 (스냅샷 로드 시 한 번 구축)
+        started = time.perf_counter()
+        self.search_index = NgramIndex(companies, records)
+        self.timings["search_index"] = (time.perf_counter() - started) * 1000
+        # 카테고리 허브 페이지 (그룹화/합계/상위 지역을 미리 계산)
+        started = time.perf_counter()
+        self.category_hubs = build_category_hubs(records, companies)
+        # 지역 허브 페이지 (도도부현 -> 레코드 번호 색인 기반)
+        self.prefecture_index = build_prefecture_index(companies)
+        self.location_hubs = build_location_hubs(records, companies, self.prefecture_index)
+        self.timings["hubs"] = (time.perf_counter() - started) * 1000
+
+        mtime = signature[0] / 1e9 if signature else time.time()
+        self.mtime = mtime
+        self.last_updated = datetime.fromtimestamp(mtime).strftime("%Y-%m-%d")
+        # 스냅샷 버전 (캐시 검증 등에 사용)
+        self.version = f"{signature[0]:x}-{signature[1]:x}" if signature else "empty"
+
+
+EMPTY_SNAPSHOT = IndexSnapshot(ListTable([]))
+
+
+class IndexStore:
+    """프로세스 전역 인덱스 저장소.
+
+    최초 1회 로드 후 메모리에 보관하고, 일정 간격으로 파일의 mtime/size 만
+    확인하여 변경되었을 때만 백그라운드 스레드에서 새 스냅샷을 만들어 통째로 교체합니다.
+    컬럼형 파일(bin_path)이 있고 올바르면 mmap 으로 열어 사용하고,
+    없거나 깨졌으면 JSON 을 읽습니다.
+    """
+
+    def __init__(self, path, bin_path=None, check_interval=5.0):
+        self.path = path
+        self.bin_path = bin_path
+        self.check_interval = check_interval
+        self._snapshot = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def _stat(self):
+        """(mtime_ns, size, 경로) - 사용할 파일을 고르고 그 서명을 반환합니다.
+
+        파일 시각은 복사/체크아웃 순서에 따라 달라지므로 mtime 으로 고르지 않고,
+        컬럼형 파일이 있고 헤더 검사(magic, 길이)를 통과하면 항상 그것을 사용합니다.
+        """
+        for path in (self.bin_path, self.path):
+            if not path:
+                continue
+            if path == self.bin_path and not is_columnar(path):
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            return st.st_mtime_ns, st.st_size, path
+        return None
+
+    def _load(self, signature):
+        if signature is None:
+            return EMPTY_SNAPSHOT
+        path = signature[2]
+        if path == self.bin_path:
+            return IndexSnapshot(ColumnarTable(path), signature)
+
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        data = json.loads(content) if content else []
+        if not isinstance(data, list):
+            data = []
+        return IndexSnapshot(ListTable([to_company(item) for item in data]), signature)
+
+    def _swap(self, signature, force=False):
+        """signature 의 파일로 새 스냅샷을 만들어 교체합니다. (self._lock 을 잡은 상태에서 호출)"""
+        current = self._snapshot
+        if not force and current is not None and current.signature == signature:
+            return current
+        try:
+            with timed("index_load"):
+                self._snapshot = self._load(signature)
+        except Exception as e:
+            # 파일이 쓰이는 도중이거나 깨진 경우 기존 스냅샷을 유지하고 다음 확인 때 재시도
+            print(f"Error loading index: {e}")
+            if current is None:
+                self._snapshot = EMPTY_SNAPSHOT
+        return self._snapshot
+
+    def reload(self, force=False):
+        """파일이 바뀌었으면 새 스냅샷을 로드해 교체합니다. (호출한 스레드에서 완료될 때까지 대기)"""
+        with self._lock:
+            self._last_check = time.monotonic()
+            return self._swap(self._stat(), force)
+
+    def _load_and_release(self, signature):
+        try:
+            self._swap(signature)
+        finally:
+            self._lock.release()
+
+    def _reload_in_background(self):
+        """stat 으로 변경 여부만 확인하고, 바뀌었으면 백그라운드 스레드에서 새 스냅샷을 만듭니다.
+
+        디코딩/검색 색인/허브 구축이 이벤트 루프를 막지 않도록, 완료될 때까지는
+        기존 스냅샷을 계속 사용하고 준비되면 통째로 교체합니다.
+        """
+        if not self._lock.acquire(blocking=False):
+            # 이미 확인/로드 중이면 기다리지 않음
+            return
+        try:
+            self._last_check = time.monotonic()
+            signature = self._stat()
+            if self._snapshot is not None and self._snapshot.signature == signature:
+                self._lock.release()
+                return
+            threading.Thread(target=self._load_and_release, args=(signature,), daemon=True).start()
+        except Exception:
+            self._lock.release()
+            raise
+
+    def get(self):
+        """현재 스냅샷을 반환합니다. (요청 경로에서는 주기적인 stat 외의 I/O 없음, 로드는 백그라운드)"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return self.reload()
+        if time.monotonic() - self._last_check >= self.check_interval:
+            self._reload_in_background()
+        return snapshot
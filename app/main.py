@@ -1,119 +1,327 @@
 import os
-import json
-import markdown
-import frontmatter
-from datetime import datetime
-from itertools import groupby
-from fastapi import FastAPI, Request, HTTPException
+import re
+import time
+import threading
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, HTTPException, Response
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, PlainTextResponse
+from fastapi.responses import FileResponse, PlainTextResponse, JSONResponse, RedirectResponse, StreamingResponse
+from starlette.datastructures import MutableHeaders
 
 # 설정 파일 로드
 from .config import (
-    BASE_DIR, INDEX_PATH, SITEMAP_PATH, STATIC_DIR, 
-    TEMPLATE_DIR, CONTENT_DIR, HUB_DATA
+    BASE_DIR, INDEX_PATH, INDEX_BIN_PATH, SITEMAP_PATH, SITEMAP_DIR, STATIC_DIR, 
+    TEMPLATE_DIR, CONTENT_DIR, RENDERED_DIR, HUB_DATA, INDEX_RELOAD_INTERVAL,
+    SEARCH_PAGE_SIZE, SEARCH_MAX_LIMIT,
+    RENDER_CACHE_MAX_ENTRIES, RENDER_CACHE_MAX_BYTES, RENDER_CACHE_PREWARM,
+    CACHE_CONTROL, METRICS_SERVER_TIMING, STREAM_CHUNK_SIZE
 )
+from .index_store import IndexStore
+from .render_cache import RenderCache
+from .rendering import render_report, load_prerendered
+from .pages import ROBOTS_TXT, STATIC_PAGES, home_context, hub_context, hub_title, hub_is_paginated, hub_letter_pages
+from .http_cache import get_template_version, build_cache_headers, is_not_modified
+from .metrics import (
+    REQUEST_LATENCY, CACHE_EVENTS, timed, observe_phase, start_request, end_request,
+    server_timing_header, hit_ratio, render_metrics
+)
+
+# 프로세스 전역 인덱스 저장소 (모든 라우트가 이 스냅샷을 읽음)
+index_store = IndexStore(INDEX_PATH, bin_path=INDEX_BIN_PATH, check_interval=INDEX_RELOAD_INTERVAL)
+# 상세 페이지 마크다운 변환 결과 캐시
+render_cache = RenderCache(max_entries=RENDER_CACHE_MAX_ENTRIES, max_bytes=RENDER_CACHE_MAX_BYTES)
+
+# 헬퍼 함수: 빌드 시 미리 변환된 조각을 우선 사용하고, 없거나 오래되었으면 직접 변환
+def load_report(md_path, mtime_ns):
+    report = load_prerendered(RENDERED_DIR, md_path, mtime_ns)
+    CACHE_EVENTS.inc(("prerendered", "miss" if report is None else "hit"))
+    if report is None:
+        with timed("markdown"):
+            report = render_report(md_path)
+    return report
+
+# 헬퍼 함수: 캐시를 거쳐 리포트 (메타데이터, HTML) 반환
+def get_report(md_path):
+    mtime_ns = os.stat(md_path).st_mtime_ns
+    report = render_cache.get(md_path, mtime_ns)
+    if report is None:
+        report = load_report(md_path, mtime_ns)
+        render_cache.put(md_path, mtime_ns, report)
+    return report
+
+# 헬퍼 함수: 최신 기업 N개의 리포트를 미리 변환 (백그라운드 스레드, RENDER_CACHE_PREWARM 설정 시)
+def prewarm_render_cache(count):
+    for company in index_store.get().records[-count:][::-1]:
+        md_path = os.path.join(CONTENT_DIR, f"{company.file}.md")
+        try:
+            # 히트/미스 집계와 단계 히스토그램에 섞이지 않도록 메트릭 없이 변환해 캐시에 직접 저장
+            mtime_ns = os.stat(md_path).st_mtime_ns
+            report = load_prerendered(RENDERED_DIR, md_path, mtime_ns) or render_report(md_path)
+            render_cache.put(md_path, mtime_ns, report)
+        except Exception:
+            continue
+
+# 헬퍼 함수: 모든 Jinja 템플릿을 미리 컴파일 (환경의 템플릿 캐시에 저장됨)
+def precompile_templates():
+    names = templates.env.list_templates()
+    for name in names:
+        templates.env.get_template(name)
+    return len(names)
+
+# 헬퍼 함수: 허브/검색이 읽는 인덱스 파일을 미리 페이지 캐시에 올림 (컬럼형 mmap 인 경우)
+def warm_snapshot(snapshot):
+    prefetch = getattr(snapshot.records, "prefetch", None)
+    if prefetch is not None:
+        prefetch()
+
+@asynccontextmanager
+async def lifespan(app):
+    # 서버 시작 시 인덱스 로드(검색 색인/허브 구축 포함), 템플릿 컴파일, 인덱스 파일 워밍을 미리 수행
+    timings = {}
+    started = phase = time.perf_counter()
+    snapshot = index_store.reload(force=True)
+    timings["index"] = (time.perf_counter() - phase) * 1000
+    phase = time.perf_counter()
+    template_count = precompile_templates()
+    timings["templates"] = (time.perf_counter() - phase) * 1000
+    phase = time.perf_counter()
+    warm_snapshot(snapshot)
+    timings["warm"] = (time.perf_counter() - phase) * 1000
+    total = (time.perf_counter() - started) * 1000
+
+    index_detail = ", ".join(f"{k} {v:.1f}ms" for k, v in snapshot.timings.items())
+    print(
+        f"🚀 Startup {total:.1f}ms - index {timings['index']:.1f}ms ({index_detail}), "
+        f"templates {timings['templates']:.1f}ms ({template_count}개), warm {timings['warm']:.1f}ms "
+        f"[{snapshot.total_count} companies]"
+    )
+
+    if RENDER_CACHE_PREWARM > 0:
+        threading.Thread(target=prewarm_render_cache, args=(RENDER_CACHE_PREWARM,), daemon=True).start()
+    yield
+
+class MetricsMiddleware:
+    """요청마다 라우트별 지연을 기록하고, 설정 시 Server-Timing 헤더를 붙이는 ASGI 미들웨어.
+
+    스트리밍 응답(허브/검색)도 마지막 본문 조각(more_body=False)을 보낸 시점까지를 지연으로 기록합니다.
+    Server-Timing 헤더는 응답 시작 시점에 나가므로, 그 뒤 본문을 만들며 측정되는 단계
+    (스트리밍 템플릿 렌더링 등)는 헤더에 포함되지 않고 /metrics 의 단계 히스토그램에만 반영됩니다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        phases, token = start_request()
+        started = time.perf_counter()
+        status = {"code": 500, "recorded": False}
+
+        def record():
+            status["recorded"] = True
+            elapsed = time.perf_counter() - started
+            # 실제 경로 대신 라우트 템플릿(/company/{file_id})으로 집계
+            route = scope.get("route")
+            if route is not None:
+                route_path = route.path
+            else:
+                route_path = "/static" if scope["path"].startswith("/static/") else "unmatched"
+            REQUEST_LATENCY.observe((scope["method"], route_path, str(status["code"])), elapsed)
+            request_headers = dict(scope["headers"])
+            if b"if-none-match" in request_headers or b"if-modified-since" in request_headers:
+                CACHE_EVENTS.inc(("http_304", "hit" if status["code"] == 304 else "miss"))
 
-app = FastAPI()
+        async def send_with_metrics(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                if METRICS_SERVER_TIMING:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", server_timing_header(phases, time.perf_counter() - started))
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                record()
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            end_request(token)
+            # 예외나 연결 끊김으로 본문을 끝까지 보내지 못한 요청도 집계
+            if not status["recorded"]:
+                record()
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+
+class TimedTemplates(Jinja2Templates):
+    """TemplateResponse 의 렌더링 시간을 'template' 단계로 기록하는 Jinja2Templates."""
+
+    def TemplateResponse(self, *args, **kwargs):
+        with timed("template"):
+            return super().TemplateResponse(*args, **kwargs)
 
 # 정적 파일 및 템플릿 설정
 app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
-templates = Jinja2Templates(directory=TEMPLATE_DIR)
+templates = TimedTemplates(directory=TEMPLATE_DIR)
+# 템플릿 버전 (배포로 템플릿이 바뀌면 ETag/Last-Modified 도 바뀜)
+TEMPLATE_VERSION = get_template_version(TEMPLATE_DIR)
 
-# 헬퍼 함수: 인덱스 데이터 로드
-def get_index_data():
-    if not os.path.exists(INDEX_PATH):
-        return []
+# 헬퍼 함수: 라우트별 검증자(ETag, Last-Modified)와 Cache-Control 헤더 생성
+def cache_headers(route, version, last_modified):
+    return build_cache_headers(
+        CACHE_CONTROL[route],
+        f"{route}:{version}:{TEMPLATE_VERSION}",
+        max(last_modified, TEMPLATE_VERSION)
+    )
+
+# 사이트맵 샤드 파일명 (build_data.py 의 SitemapWriter 가 생성)
+SITEMAP_SHARD_RE = re.compile(r'^sitemap-\d+\.xml(\.gz)?$')
+
+# 헬퍼 함수: 사이트맵 파일을 검증자/캐시 헤더와 함께 응답
+def sitemap_response(request, path):
     try:
-        with open(INDEX_PATH, 'r', encoding='utf-8') as f:
-            content = f.read()
-            if not content: return []
-            data = json.loads(content)
-            return data if isinstance(data, list) else []
-    except Exception as e:
-        print(f"Error loading index: {e}")
-        return []
+        st = os.stat(path)
+    except OSError:
+        raise HTTPException(status_code=404, detail="Page not found")
+    headers = cache_headers("sitemap", f"{st.st_mtime_ns}-{st.st_size}", st.st_mtime)
+    if is_not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+    media_type = "application/gzip" if path.endswith(".gz") else "application/xml"
+    return FileResponse(path, media_type=media_type, headers=headers)
 
-# 정렬 및 그룹화를 위한 안전한 키 추출 함수 (일본어 강제 매핑)
-def get_safe_char(company):
-    name = company.get('en') or company.get('n') or "Unknown"
-    first_char = name.strip()[0].upper() if name.strip() else "A"
-    
-    # 1. 영문자이면 그대로 반환
-    if 'A' <= first_char <= 'Z':
-        return first_char
-    
-    # 2. 영문자가 아닌 경우(일본어 등) 아스키 코드 합산 후 나머지 연산으로 A~Z 매핑
-    char_code = sum(ord(c) for c in first_char)
-    mapped_char = chr(ord('A') + (char_code % 26))
-    return mapped_char
+# 헬퍼 함수: 현재 인덱스 스냅샷의 레코드 목록
+def get_index_data():
+    return index_store.get().records
+
+# 헬퍼 함수: 템플릿을 generate() 로 렌더링하며 STREAM_CHUNK_SIZE 단위로 바로 전송
+# (전체 HTML 문자열을 만들지 않으므로 큰 허브 페이지의 첫 바이트 시간과 메모리 사용량이 줄어듦)
+def stream_template(request, name, context, headers):
+    template = templates.get_template(name)
+
+    def chunks():
+        # 클라이언트로 보내는 동안의 대기 시간은 빼고 렌더링 시간만 기록
+        elapsed = 0.0
+        started = time.perf_counter()
+        buffer, size = [], 0
+        for piece in template.generate(request=request, **context):
+            buffer.append(piece)
+            size += len(piece)
+            if size >= STREAM_CHUNK_SIZE:
+                elapsed += time.perf_counter() - started
+                yield "".join(buffer)
+                started = time.perf_counter()
+                buffer, size = [], 0
+        elapsed += time.perf_counter() - started
+        observe_phase("template", elapsed)
+        if buffer:
+            yield "".join(buffer)
+
+    return StreamingResponse(chunks(), media_type="text/html; charset=utf-8", headers=headers)
+
+# 헬퍼 함수: 미리 계산된 HubPage 로 hub.html 을 스트리밍 렌더링
+def render_hub(request, context):
+    snapshot = index_store.get()
+    headers = cache_headers("hub", snapshot.version, snapshot.mtime)
+    if is_not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+
+    return stream_template(request, "hub.html", context, headers)
 
 @app.get("/")
 async def home(request: Request):
-    index_data = get_index_data()
-    total_count = len(index_data)
-    latest_companies = index_data[-8:][::-1] if index_data else []
-    
-    last_updated = datetime.now().strftime("%Y-%m-%d")
-    if os.path.exists(INDEX_PATH):
-        last_updated = datetime.fromtimestamp(os.path.getmtime(INDEX_PATH)).strftime("%Y-%m-%d")
+    snapshot = index_store.get()
+    headers = cache_headers("home", snapshot.version, snapshot.mtime)
+    if is_not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
 
     return templates.TemplateResponse(
         request=request,
         name="index.html",
-        context={
-            "latest": latest_companies,
-            "total_count": "{:,}".format(total_count),
-            "last_updated": last_updated
-        }
+        context=home_context(snapshot),
+        headers=headers
     )
 
+# 헬퍼 함수: 관련도 순 검색 (limit/offset 보정 포함)
+def run_search(q, limit, offset):
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+    offset = max(0, offset)
+    if not q:
+        return 0, [], limit, offset
+    snapshot = index_store.get()
+    records = snapshot.records
+    with timed("search"):
+        total, ids = snapshot.search_index.search(q, limit, offset)
+    return total, [records[i] for i in ids], limit, offset
+
 @app.get("/search")
-async def search(request: Request, q: str = ""):
-    results = []
-    if q:
-        index_data = get_index_data()
-        q_lower = q.lower()
-        results = [c for c in index_data if q_lower in c.get('n', '').lower() or q_lower in c.get('en', '').lower()]
-    
-    return templates.TemplateResponse(
-        request=request,
-        name="index.html",
-        context={"results": results, "query": q}
+async def search(request: Request, q: str = "", limit: int = SEARCH_PAGE_SIZE, offset: int = 0):
+    snapshot = index_store.get()
+    headers = cache_headers("search", snapshot.version, snapshot.mtime)
+    if is_not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+
+    total, results, limit, offset = run_search(q, limit, offset)
+
+    return stream_template(
+        request,
+        "index.html",
+        {
+            "results": results,
+            "query": q,
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "prev_offset": max(0, offset - limit) if offset > 0 else None,
+            "next_offset": offset + limit if offset + limit < total else None
+        },
+        headers
     )
 
+@app.get("/api/search")
+async def api_search(q: str = "", limit: int = SEARCH_PAGE_SIZE, offset: int = 0):
+    total, results, limit, offset = run_search(q, limit, offset)
+    return JSONResponse({
+        "query": q,
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "results": [c._asdict() for c in results]
+    })
+
 @app.get("/company/{file_id}")
 async def detail(request: Request, file_id: str):
-    md_path = os.path.join(CONTENT_DIR, f"{file_id}.md")
+    snapshot = index_store.get()
 
-    if not os.path.exists(md_path):
+    if snapshot.records.find_file(file_id) is None:
+        # 짧은 URL(jp_번호)이나 이전 슬러그는 인덱스의 id 로 찾아 정식 URL 로 301 리다이렉트
         parts = file_id.split('_')
-        if len(parts) >= 2:
-            actual_id_prefix = f"{parts[0]}_{parts[1]}"
-            for f in os.listdir(CONTENT_DIR):
-                if f.startswith(actual_id_prefix) and f.endswith(".md"):
-                    md_path = os.path.join(CONTENT_DIR, f)
-                    break
-
-    if not os.path.exists(md_path):
+        company = snapshot.records.find_id(f"{parts[0]}_{parts[1]}") if len(parts) >= 2 else None
+        if company is None:
+            raise HTTPException(status_code=404, detail="Company report not found")
+        return RedirectResponse(url=f"/company/{company.file}", status_code=301)
+
+    md_path = os.path.join(CONTENT_DIR, f"{file_id}.md")
+    try:
+        st = os.stat(md_path)
+    except OSError:
         raise HTTPException(status_code=404, detail="Company report not found")
-        
+
+    # 마크다운 변환/템플릿 렌더링 전에 파일 mtime 기반으로 304 판단
+    headers = cache_headers("company", f"{st.st_mtime_ns}-{st.st_size}", st.st_mtime)
+    if is_not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+
     try:
-        with open(md_path, 'r', encoding='utf-8') as f:
-            post = frontmatter.load(f)
-            company_data = post.metadata
-            if 'id' not in company_data: company_data['id'] = file_id
-            if 'title_en' not in company_data: company_data['title_en'] = company_data.get('title', 'Unknown')
-            if 'subsidies' not in company_data: company_data['subsidies'] = 0
-            if 'address' not in company_data: company_data['address'] = 'Unknown'
-
-            content_html = markdown.markdown(post.content, extensions=['extra', 'tables', 'nl2br'])
-            
+        company_data, content_html = get_report(md_path)
+
         return templates.TemplateResponse(
             request=request,
             name="detail.html",
-            context={"company": company_data, "content": content_html}
+            context={"company": company_data, "content": content_html},
+            headers=headers
         )
     except Exception as e:
         print(f"Detail error: {e}")
@@ -125,42 +333,89 @@ async def category_hub(request: Request, category_slug: str):
     if not category_info:
         raise HTTPException(status_code=404, detail="Category not found")
         
-    index_data = get_index_data()
-    category_name = category_info["name"]
-    
-    filtered = [c for c in index_data if c.get('c', '').lower() == category_name.lower()]
-    filtered.sort(key=lambda x: (x.get('en') or x.get('n') or "Unknown").strip().upper())
+    slug = category_slug.lower()
+    hub = index_store.get().category_hubs[slug]
+    title, category_name = hub_title(category_slug=slug)
+    letter_base = f"/category/{slug}" if hub_is_paginated(hub) else None
 
-    grouped_results = {}
-    for char, group in groupby(filtered, key=get_safe_char):
-        if char not in grouped_results: grouped_results[char] = []
-        grouped_results[char].extend(list(group))
+    return render_hub(request, hub_context(hub, title, category_name, letter_base=letter_base))
 
-    alphabet_keys = sorted(grouped_results.keys())
+@app.get("/category/{category_slug}/{letter}")
+async def category_letter_hub(request: Request, category_slug: str, letter: str):
+    slug = category_slug.lower()
+    if slug not in HUB_DATA["categories"]:
+        raise HTTPException(status_code=404, detail="Category not found")
 
-    return templates.TemplateResponse(
-        request=request,
-        name="hub.html",
-        context={
-            "title": f"{category_name} Industry",
-            "category_name": category_name,
-            "total_count": len(filtered),
-            "total_subsidies": sum([int(c.get('s', 0)) for c in filtered]),
-            "grouped_results": grouped_results,
-            "alphabet": alphabet_keys
-        }
-    )
+    hub = index_store.get().category_hubs[slug]
+    upper = letter.upper()
+    if upper not in hub.grouped_results:
+        raise HTTPException(status_code=404, detail="Page not found")
+    # 같은 내용이 여러 URL 로 노출되지 않도록 정식 URL 로 301 리다이렉트
+    # (나누지 않은 허브는 한 페이지의 앵커, 나눈 허브의 첫 글자는 기본 페이지, 소문자 글자/슬러그는 대문자 URL)
+    if not hub_is_paginated(hub):
+        return RedirectResponse(url=f"/category/{slug}#letter-{upper}", status_code=301)
+    if upper not in hub_letter_pages(hub):
+        return RedirectResponse(url=f"/category/{slug}", status_code=301)
+    if letter != upper or category_slug != slug:
+        return RedirectResponse(url=f"/category/{slug}/{upper}", status_code=301)
+    title, category_name = hub_title(category_slug=slug)
+
+    return render_hub(request, hub_context(hub, title, category_name, letter=upper, letter_base=f"/category/{slug}"))
+
+@app.get("/location/{location_slug}")
+async def location_hub(request: Request, location_slug: str):
+    location_info = HUB_DATA["locations"].get(location_slug.lower())
+    if not location_info:
+        raise HTTPException(status_code=404, detail="Location not found")
+
+    hub = index_store.get().location_hubs[(location_slug.lower(), None)]
+
+    return render_hub(request, hub_context(hub, *hub_title(location_slug.lower())))
+
+@app.get("/location/{location_slug}/{category_slug}")
+async def location_category_hub(request: Request, location_slug: str, category_slug: str):
+    location_info = HUB_DATA["locations"].get(location_slug.lower())
+    category_info = HUB_DATA["categories"].get(category_slug.lower())
+    if not location_info or not category_info:
+        raise HTTPException(status_code=404, detail="Location not found")
+
+    hub = index_store.get().location_hubs[(location_slug.lower(), category_slug.lower())]
+
+    return render_hub(request, hub_context(hub, *hub_title(location_slug.lower(), category_slug.lower())))
+
+@app.get("/metrics")
+async def metrics():
+    snapshot = index_store.get()
+    cache = render_cache.stats()
+    gauges = [
+        ("companydb_index_companies", "Companies in the current index snapshot.", "gauge", snapshot.total_count),
+        ("companydb_render_cache_entries", "Entries in the detail render cache.", "gauge", cache["entries"]),
+        ("companydb_render_cache_bytes", "Approximate bytes held by the detail render cache.", "gauge", cache["bytes"]),
+        ("companydb_render_cache_hits_total", "Detail render cache hits.", "counter", cache["hits"]),
+        ("companydb_render_cache_misses_total", "Detail render cache misses.", "counter", cache["misses"]),
+        ("companydb_render_cache_hit_ratio", "Detail render cache hit ratio.", "gauge", f"{cache['hit_ratio']:.4f}"),
+        ("companydb_prerendered_hit_ratio", "Share of report loads served from pre-rendered fragments.", "gauge", f"{hit_ratio('prerendered'):.4f}"),
+        ("companydb_http_304_ratio", "Share of conditional requests answered with 304.", "gauge", f"{hit_ratio('http_304'):.4f}"),
+    ]
+    return PlainTextResponse(render_metrics(gauges), media_type="text/plain; version=0.0.4")
 
 @app.get("/{page_name}")
 async def static_page(request: Request, page_name: str):
-    if page_name in ["privacy", "about"]:
-        return templates.TemplateResponse(request=request, name=f"{page_name}.html", context={})
+    if page_name in STATIC_PAGES:
+        headers = cache_headers("page", page_name, TEMPLATE_VERSION)
+        if is_not_modified(request, headers):
+            return Response(status_code=304, headers=headers)
+        return templates.TemplateResponse(request=request, name=f"{page_name}.html", context={}, headers=headers)
     
     if page_name == "robots.txt":
-        return PlainTextResponse("User-agent: *\nAllow: /\nSitemap: https://companydb.net/sitemap.xml")
+        return PlainTextResponse(ROBOTS_TXT)
     
-    if page_name == "sitemap.xml":
-        return FileResponse(SITEMAP_PATH, media_type="application/xml") if os.path.exists(SITEMAP_PATH) else HTTPException(404)
+    # 기존에 등록된 /sitemap.xml 도 사이트맵 인덱스를 가리키도록 유지
+    if page_name in ["sitemap.xml", "sitemap_index.xml"]:
+        return sitemap_response(request, SITEMAP_PATH)
+
+    if SITEMAP_SHARD_RE.match(page_name):
+        return sitemap_response(request, os.path.join(SITEMAP_DIR, page_name))
         
     if page_name == "ads.txt":
         ads_path = os.path.join(STATIC_DIR, "ads.txt")
@@ -0,0 +1,144 @@
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from .config import METRICS_BUCKETS
+
+# 현재 요청에서 측정된 단계 목록 [(단계, 초)] - Server-Timing 헤더용 (요청 밖에서는 None)
+_request_phases = ContextVar("request_phases", default=None)
+
+
+class Histogram:
+    """라벨 조합별 누적 버킷 히스토그램. Prometheus 텍스트 형식으로 출력합니다."""
+
+    def __init__(self, name, help_text, label_names, buckets=METRICS_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # 라벨 값 튜플 -> [버킷별 개수..., 합계, 개수]
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                self._series[labels] = series = [0] * (len(self.buckets) + 2)
+            for k, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[k] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._series.items())
+        for labels, series in items:
+            label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.label_names, labels))
+            prefix = label_text + "," if label_text else ""
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{label_text}}} {series[-1]}")
+        return lines
+
+
+class Counter:
+    """라벨 조합별 단조 증가 카운터."""
+
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def get(self, labels):
+        return self._values.get(labels, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.label_names, labels))
+            lines.append(f"{self.name}{{{label_text}}} {value}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# 라우트별 요청 지연 (라우트 경로 템플릿 기준이므로 기업 수와 관계없이 시계열 수가 일정)
+REQUEST_LATENCY = Histogram(
+    "companydb_request_duration_seconds", "HTTP request latency by route.", ("method", "route", "status")
+)
+# 요청 내부 단계별 지연 (index_load, search, markdown, template)
+PHASE_LATENCY = Histogram(
+    "companydb_phase_duration_seconds", "Time spent in internal phases.", ("phase",)
+)
+# 캐시 계층별 적중/실패 (http_304: 조건부 요청, prerendered: 빌드 시 변환된 조각)
+CACHE_EVENTS = Counter(
+    "companydb_cache_events_total", "Cache lookups by layer and result.", ("cache", "result")
+)
+
+
+def observe_phase(phase, elapsed):
+    """단계 소요 시간(초)을 단계 히스토그램과 현재 요청의 Server-Timing 목록에 기록합니다."""
+    PHASE_LATENCY.observe((phase,), elapsed)
+    phases = _request_phases.get()
+    if phases is not None:
+        phases.append((phase, elapsed))
+
+
+@contextmanager
+def timed(phase):
+    """블록의 소요 시간을 observe_phase 로 기록합니다."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_phase(phase, time.perf_counter() - started)
+
+
+def start_request():
+    """요청 하나의 단계 측정을 시작합니다. (단계 목록, 해제용 토큰)"""
+    phases = []
+    return phases, _request_phases.set(phases)
+
+
+def end_request(token):
+    _request_phases.reset(token)
+
+
+def server_timing_header(phases, total):
+    """[(단계, 초)] 를 Server-Timing 헤더 값으로 변환 (같은 단계는 합산)."""
+    durations = {}
+    for phase, elapsed in phases:
+        durations[phase] = durations.get(phase, 0.0) + elapsed
+    parts = [f"{phase};dur={elapsed * 1000:.1f}" for phase, elapsed in durations.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def hit_ratio(cache):
+    hits, misses = CACHE_EVENTS.get((cache, "hit")), CACHE_EVENTS.get((cache, "miss"))
+    return hits / (hits + misses) if hits + misses else 0.0
+
+
+def render_metrics(gauges=()):
+    """모든 히스토그램과 gauges [(이름, 설명, 타입, 값)] 을 Prometheus 텍스트 형식으로 반환합니다."""
+    lines = REQUEST_LATENCY.render() + PHASE_LATENCY.render() + CACHE_EVENTS.render()
+    for name, help_text, metric_type, value in gauges:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
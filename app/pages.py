@@ -0,0 +1,150 @@
+import os
+from types import SimpleNamespace
+
+import jinja2
+
+from .config import TEMPLATE_DIR, RENDERED_DIR, HUB_DATA, HUB_LETTER_PAGES_MIN
+from .rendering import render_report, load_prerendered
+
+# 서버 라우트와 정적 내보내기(build_data.py export)가 같은 내용을 내도록 공유
+ROBOTS_TXT = "User-agent: *\nAllow: /\nSitemap: https://companydb.net/sitemap_index.xml"
+STATIC_PAGES = ["about", "privacy"]
+
+
+def home_context(snapshot):
+    return {
+        "latest": snapshot.latest,
+        "total_count": "{:,}".format(snapshot.total_count),
+        "last_updated": snapshot.last_updated
+    }
+
+
+def hub_is_paginated(hub):
+    """HUB_LETTER_PAGES_MIN 이상인 허브는 글자별 페이지로 나눠 보여줍니다."""
+    return HUB_LETTER_PAGES_MIN > 0 and hub.total_count >= HUB_LETTER_PAGES_MIN
+
+
+def hub_context(hub, title, category_name, letter=None, letter_base=None):
+    """hub.html 컨텍스트.
+
+    letter 를 주면 그 글자 그룹만 싣고, letter_base 를 주면 A-Z 메뉴가 글자별 페이지
+    ({letter_base}/{글자})로 연결됩니다. letter 없이 letter_base 만 주면 (글자별로 나눈 허브의
+    기본 페이지) 첫 글자 그룹을 싣고, 메뉴의 첫 글자는 기본 페이지로 연결됩니다.
+    """
+    grouped_results = hub.grouped_results
+    current_letter = letter
+    if letter is not None:
+        title = f"{title} - {letter}"
+    elif letter_base is not None and hub.alphabet:
+        current_letter = hub.alphabet[0]
+    if current_letter is not None:
+        grouped_results = {current_letter: grouped_results[current_letter]}
+
+    letter_urls = None
+    if letter_base is not None:
+        letter_urls = {char: f"{letter_base}/{char}" for char in hub.alphabet}
+        if hub_is_paginated(hub) and hub.alphabet:
+            # 첫 글자 페이지는 기본 페이지와 내용이 같으므로 기본 URL 하나로 연결
+            letter_urls[hub.alphabet[0]] = letter_base
+    return {
+        "title": title,
+        "category_name": category_name,
+        "total_count": hub.total_count,
+        "total_subsidies": hub.total_subsidies,
+        "top_locations": hub.top_locations,
+        "grouped_results": grouped_results,
+        "alphabet": hub.alphabet,
+        "letter_urls": letter_urls,
+        "current_letter": current_letter
+    }
+
+
+def hub_letter_pages(hub):
+    """글자별 페이지로 제공하는 글자 목록.
+
+    나누지 않은 허브는 한 페이지의 #letter-X 앵커로 충분하므로 없고,
+    나눈 허브의 첫 글자는 기본 페이지가 대신합니다.
+    """
+    return hub.alphabet[1:] if hub_is_paginated(hub) else []
+
+
+def hub_title(location_slug=None, category_slug=None):
+    """허브 페이지의 (제목, 표시용 이름)."""
+    location = HUB_DATA["locations"].get(location_slug) if location_slug else None
+    category = HUB_DATA["categories"].get(category_slug) if category_slug else None
+    if location and category:
+        return f"{category['name']} Companies in {location['name']}", f"{location['name']} {category['name']}"
+    if location:
+        return f"Companies in {location['name']}", location["name"]
+    return f"{category['name']} Industry", category["name"]
+
+
+def iter_hub_pages(snapshot):
+    """모든 카테고리 허브(글자별 페이지 포함)와 지역 허브의 (URL 경로, hub.html 컨텍스트)."""
+    for slug, hub in snapshot.category_hubs.items():
+        title, category_name = hub_title(category_slug=slug)
+        base = f"/category/{slug}"
+        yield base, hub_context(hub, title, category_name, letter_base=base if hub_is_paginated(hub) else None)
+        for letter in hub_letter_pages(hub):
+            yield f"{base}/{letter}", hub_context(hub, title, category_name, letter=letter, letter_base=base)
+    for (location_slug, category_slug), hub in snapshot.location_hubs.items():
+        path = f"/location/{location_slug}" + (f"/{category_slug}" if category_slug else "")
+        yield path, hub_context(hub, *hub_title(location_slug, category_slug))
+
+
+# --- FastAPI 밖에서 렌더링 (정적 내보내기) ---
+
+class PageRequest:
+    """템플릿이 참조하는 request 속성(url.path, path_params)만 가진 대체 객체."""
+
+    def __init__(self, path, path_params=None):
+        self.url = SimpleNamespace(path=path)
+        self.path_params = path_params or {}
+
+
+_environment = None
+
+
+def get_environment():
+    """Jinja2Templates 와 같은 설정(autoescape)의 템플릿 환경. 프로세스마다 한 번 만듭니다."""
+    global _environment
+    if _environment is None:
+        _environment = jinja2.Environment(loader=jinja2.FileSystemLoader(TEMPLATE_DIR), autoescape=True)
+    return _environment
+
+
+def render_page(name, path, context, path_params=None):
+    return get_environment().get_template(name).render(request=PageRequest(path, path_params), **context)
+
+
+def export_path(export_dir, path):
+    """URL 경로 -> 내보낼 파일 경로 (/ -> index.html, /company/x -> company/x.html)."""
+    return os.path.join(export_dir, "index.html" if path == "/" else path.lstrip("/") + ".html")
+
+
+def write_page(file_path, html):
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(html)
+    os.replace(tmp_path, file_path)
+
+
+def export_company_pages(items, export_dir):
+    """상세 페이지들을 HTML 파일로 씁니다. (프로세스 풀 작업 단위)
+
+    items 는 (file_id, md_path) 목록이며, 실패한 항목의 [(file_id, 오류 메시지)] 를 반환합니다.
+    """
+    errors = []
+    for file_id, md_path in items:
+        try:
+            mtime_ns = os.stat(md_path).st_mtime_ns
+            company_data, content_html = load_prerendered(RENDERED_DIR, md_path, mtime_ns) or render_report(md_path)
+            path = f"/company/{file_id}"
+            html = render_page(
+                "detail.html", path, {"company": company_data, "content": content_html}, {"file_id": file_id}
+            )
+            write_page(export_path(export_dir, path), html)
+        except Exception as e:
+            errors.append((file_id, str(e)))
+    return errors
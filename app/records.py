@@ -0,0 +1,38 @@
+import sys
+from collections import namedtuple
+
+# 인덱스 레코드 (dict 대신 튜플 기반으로 메모리 절약, 템플릿에서는 res.n 처럼 속성 접근)
+Company = namedtuple("Company", ["id", "file", "n", "en", "l", "s", "c"])
+
+
+def to_company(item):
+    """search_index.json 의 dict 한 건을 Company 로 변환합니다."""
+    return Company(
+        id=str(item.get('id', '')),
+        file=str(item.get('file', '')),
+        n=str(item.get('n', '')),
+        en=str(item.get('en', '')),
+        l=str(item.get('l', '')),
+        s=int(item.get('s', 0) or 0),
+        # 카테고리는 종류가 몇 개 없으므로 intern 하여 문자열 객체를 공유
+        c=sys.intern(str(item.get('c', 'Services'))),
+    )
+
+
+class ListTable(list):
+    """JSON 인덱스에서 읽은 Company 목록. ColumnarTable 과 같은 조회 메서드를 제공합니다."""
+
+    def __init__(self, companies):
+        super().__init__(companies)
+        # 상세 페이지 URL 해석용 (파일명 -> 레코드, 기업 id -> 레코드)
+        self._by_file = {c.file: c for c in self}
+        self._by_id = {}
+        for c in self:
+            if c.id:
+                self._by_id.setdefault(c.id, c)
+
+    def find_file(self, file):
+        return self._by_file.get(file)
+
+    def find_id(self, company_id):
+        return self._by_id.get(company_id)
@@ -0,0 +1,57 @@
+import sys
+import threading
+from collections import OrderedDict
+
+
+class RenderCache:
+    """상세 페이지용 변환 결과(메타데이터, HTML)를 담는 LRU 캐시.
+
+    키는 마크다운 파일 경로이며, 저장 시점의 mtime 과 다르면 미스로 처리하여
+    build_data.py 로 다시 생성된 리포트가 바로 반영되도록 합니다.
+    """
+
+    def __init__(self, max_entries=2000, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path, mtime_ns):
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != mtime_ns:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(path)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, path, mtime_ns, value):
+        metadata, html = value
+        size = sys.getsizeof(html) + sys.getsizeof(metadata)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self.current_bytes -= old[2]
+            self._entries[path] = (mtime_ns, value, size)
+            self.current_bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes
+            ):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,84 @@
+import os
+import json
+import hashlib
+
+# 리포트 마크다운 변환에 사용하는 확장 (서버와 빌드 스크립트 공통)
+MARKDOWN_EXTENSIONS = ['extra', 'tables', 'nl2br']
+
+
+def render_report(md_path):
+    """마크다운 리포트를 읽어 (메타데이터, 본문 HTML) 을 반환합니다."""
+    # 미리 변환된 조각이 없을 때만 필요하므로, 서버 기동 시간을 줄이기 위해 처음 호출할 때 import
+    import markdown
+    import frontmatter
+
+    file_id = os.path.basename(md_path)[:-len(".md")]
+    with open(md_path, 'r', encoding='utf-8') as f:
+        post = frontmatter.load(f)
+
+    company_data = post.metadata
+    if 'id' not in company_data: company_data['id'] = file_id
+    if 'title_en' not in company_data: company_data['title_en'] = company_data.get('title', 'Unknown')
+    if 'subsidies' not in company_data: company_data['subsidies'] = 0
+    if 'address' not in company_data: company_data['address'] = 'Unknown'
+
+    content_html = markdown.markdown(post.content, extensions=MARKDOWN_EXTENSIONS)
+    return company_data, content_html
+
+
+def get_fragment_paths(rendered_dir, file_id):
+    """미리 변환된 HTML 조각과 메타데이터 사이드카 경로를 반환합니다."""
+    base = os.path.join(rendered_dir, file_id)
+    return f"{base}.html", f"{base}.json"
+
+
+def is_same_source(md_path, sidecar):
+    """원본 크기와 SHA-1 이 사이드카에 기록된 값과 같은지 확인합니다."""
+    size = sidecar.get("source_size")
+    if size is not None and os.path.getsize(md_path) != size:
+        return False
+    with open(md_path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest() == sidecar.get("sha1")
+
+
+def load_prerendered(rendered_dir, md_path, mtime_ns):
+    """build_data.py render 로 만든 조각을 읽습니다. 원본 내용이 바뀌었으면 None.
+
+    체크아웃/복사로 mtime 만 달라진 경우가 많으므로, mtime 이 다르면 크기와 해시로 다시 비교합니다.
+    """
+    file_id = os.path.basename(md_path)[:-len(".md")]
+    html_path, meta_path = get_fragment_paths(rendered_dir, file_id)
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            sidecar = json.load(f)
+        if sidecar.get("source_mtime_ns") != mtime_ns and not is_same_source(md_path, sidecar):
+            return None
+        with open(html_path, 'r', encoding='utf-8') as f:
+            content_html = f.read()
+    except (OSError, ValueError):
+        return None
+    return sidecar["metadata"], content_html
+
+
+def prerender_report(md_path, rendered_dir):
+    """리포트 하나를 HTML 조각 + 메타데이터 사이드카로 저장합니다. (프로세스 풀 작업 단위)
+
+    반환값: (파일명, mtime_ns, size, sha1)
+    """
+    st = os.stat(md_path)
+    with open(md_path, 'rb') as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+
+    company_data, content_html = render_report(md_path)
+    file_id = os.path.basename(md_path)[:-len(".md")]
+    html_path, meta_path = get_fragment_paths(rendered_dir, file_id)
+
+    with open(html_path, 'w', encoding='utf-8') as f:
+        f.write(content_html)
+    # 사이드카를 나중에 써서, 사이드카가 있으면 HTML 도 완성되어 있도록 함
+    sidecar = {"metadata": company_data, "source_mtime_ns": st.st_mtime_ns, "source_size": st.st_size, "sha1": digest}
+    with open(f"{meta_path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(sidecar, f, ensure_ascii=False, default=str)
+    os.replace(f"{meta_path}.tmp", meta_path)
+
+    return os.path.basename(md_path), st.st_mtime_ns, st.st_size, digest
@@ -0,0 +1,120 @@
+import heapq
+from array import array
+from bisect import bisect_left
+
+# 후보가 이 개수 이하로 줄어들면 교집합을 멈추고 실제 부분 문자열 검사로 확정
+VERIFY_THRESHOLD = 64
+
+
+def _grams(text):
+    """텍스트의 문자 1-gram 과 2-gram 집합을 반환합니다."""
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+def _query_grams(q):
+    if len(q) == 1:
+        return {q}
+    return {q[i:i + 2] for i in range(len(q) - 1)}
+
+
+def _intersect(small, large):
+    """정렬된 두 posting 리스트의 교집합 (작은 쪽을 큰 쪽에서 이분 탐색)."""
+    out = array('i')
+    lo, hi = 0, len(large)
+    for x in small:
+        lo = bisect_left(large, x, lo, hi)
+        if lo == hi:
+            break
+        if large[lo] == x:
+            out.append(x)
+    return out
+
+
+class NgramIndex:
+    """회사명(n, en)에 대한 문자 n-gram 역색인.
+
+    기존 `q in n.lower() or q in en.lower()` 와 동일한 결과를 레코드 순서대로
+    돌려주며, 전체 스캔 대신 posting 리스트 교집합으로 후보를 좁힙니다.
+    """
+
+    def __init__(self, companies, table=None):
+        # 컬럼형 테이블은 소문자 이름/보조금 컬럼을 mmap 에서 바로 제공하므로 따로 보관하지 않음
+        shared_names = getattr(table, "lowered_names", None)
+        shared_subsidies = getattr(table, "subsidies", None)
+
+        postings = {}
+        names = []
+        subsidies = array('i')
+        for i, c in enumerate(companies):
+            n_lower, en_lower = c.n.lower(), c.en.lower()
+            if shared_names is None:
+                names.append((n_lower, en_lower))
+            if shared_subsidies is None:
+                subsidies.append(c.s)
+            for g in _grams(n_lower) | _grams(en_lower):
+                plist = postings.get(g)
+                if plist is None:
+                    postings[g] = plist = array('i')
+                plist.append(i)
+        self.postings = postings
+        self.names = names if shared_names is None else shared_names
+        self.subsidies = subsidies if shared_subsidies is None else shared_subsidies
+
+    def find(self, q):
+        """q 를 부분 문자열로 포함하는 레코드 번호 목록을 반환합니다."""
+        q_lower = q.lower()
+        if not q_lower:
+            return []
+
+        lists = []
+        for g in _query_grams(q_lower):
+            plist = self.postings.get(g)
+            if plist is None:
+                return []
+            lists.append(plist)
+        lists.sort(key=len)
+
+        candidates = lists[0]
+        for plist in lists[1:]:
+            if len(candidates) <= VERIFY_THRESHOLD:
+                break
+            candidates = _intersect(candidates, plist)
+
+        # 1~2글자 질의는 posting 자체가 정확한 결과 (필드별로 gram 을 뽑았으므로)
+        if len(q_lower) <= 2:
+            return list(candidates)
+        names = self.names
+        matches = []
+        for i in candidates:
+            n_lower, en_lower = names[i]
+            if q_lower in n_lower or q_lower in en_lower:
+                matches.append(i)
+        return matches
+
+    def search(self, q, limit, offset=0):
+        """관련도 순으로 정렬된 (전체 매칭 수, 해당 페이지의 레코드 번호 목록)을 반환합니다.
+
+        정확히 일치 > 접두 일치 > 부분 일치 순이며, 같은 등급에서는 보조금 건수(s)가
+        많은 순, 그다음 인덱스 순서입니다. 전체를 정렬하지 않고 상위 offset+limit 개만 뽑습니다.
+        """
+        matches = self.find(q)
+        if not matches or limit <= 0:
+            return len(matches), []
+
+        q_lower = q.lower()
+        names, subsidies = self.names, self.subsidies
+
+        def rank_key(i):
+            n_lower, en_lower = names[i]
+            if q_lower == n_lower or q_lower == en_lower:
+                tier = 0
+            elif n_lower.startswith(q_lower) or en_lower.startswith(q_lower):
+                tier = 1
+            else:
+                tier = 2
+            return (tier, -subsidies[i], i)
+
+        top = heapq.nsmallest(offset + limit, matches, key=rank_key)
+        return len(matches), top[offset:]
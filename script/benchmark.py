@@ -0,0 +1,354 @@
+"""CompanyDB 벤치마크.
+
+기업 수별 합성 카탈로그(일본어/영문 회사명, 주소, 마크다운 본문, 원본 CSV)를 만들고
+빌드 단계(인덱스/사이트맵, 신규 대상 선정)와 서빙 라우트(ASGI 앱을 프로세스 내에서 호출)의
+소요 시간을 측정해 JSON 으로 저장합니다. 카탈로그 크기마다 별도 프로세스에서 실행하며,
+app/config.py 의 데이터/콘텐츠/사이트맵 경로는 환경 변수로 카탈로그를 가리키게 합니다.
+
+    python script/benchmark.py --sizes 10000 100000 500000 --out benchmark.json
+    python script/benchmark.py --sizes 10000 --compare benchmark.json   # 이전 결과와 비교
+"""
+import sys
+import os
+import io
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import contextlib
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 카탈로그 형식이 바뀌면 올려서 기존 카탈로그를 다시 생성
+CATALOG_VERSION = 1
+
+# --- 합성 데이터 어휘 (일본어, 영문) ---
+NAME_PREFIXES = [
+    ("日本", "Nippon"), ("東洋", "Toyo"), ("大和", "Yamato"), ("山田", "Yamada"), ("中央", "Chuo"),
+    ("三和", "Sanwa"), ("北陸", "Hokuriku"), ("関西", "Kansai"), ("富士", "Fuji"), ("新光", "Shinko"),
+    ("昭和", "Showa"), ("丸紅", "Marubeni"), ("高橋", "Takahashi"), ("旭", "Asahi"), ("太平", "Taihei"),
+]
+NAME_CORES = [
+    ("精密", "Precision"), ("電機", "Electric"), ("工業", "Industries"), ("技研", "Giken"), ("化学", "Chemical"),
+    ("建設", "Construction"), ("製作所", "Works"), ("医療器", "Medical Devices"), ("システム", "Systems"),
+    ("電子", "Electronics"), ("物産", "Trading"), ("金属", "Metal"), ("ソフト", "Soft"), ("機械", "Machinery"),
+]
+LOCATIONS = [
+    ("東京都", ["港区", "千代田区", "大田区", "品川区", "新宿区"]),
+    ("神奈川県", ["横浜市中区", "川崎市幸区", "相模原市"]),
+    ("大阪府", ["大阪市北区", "堺市", "東大阪市"]),
+    ("愛知県", ["名古屋市中区", "豊田市", "岡崎市"]),
+    ("北海道", ["札幌市中央区", "旭川市"]),
+    ("福岡県", ["福岡市博多区", "北九州市"]),
+    ("埼玉県", ["さいたま市大宮区", "川口市"]),
+    ("兵庫県", ["神戸市中央区", "姫路市"]),
+    ("京都府", ["京都市下京区"]),
+]
+CATEGORIES = ["Manufacturing", "Technology", "Electronics", "Medical", "Construction", "Services"]
+SENTENCES = [
+    "The company supplies precision components to domestic automotive and industrial customers.",
+    "Its regional presence supports short lead times and close collaboration with OEM partners.",
+    "Quality control follows ISO 9001 procedures with documented inspection at every stage.",
+    "Government subsidies have funded investments in automation and energy-efficient equipment.",
+    "Export readiness is growing, with English documentation and experience shipping to Asia.",
+    "Engineering teams work with clients from prototyping through mass production.",
+    "The firm maintains long-term relationships with trading houses and tier-one manufacturers.",
+    "Digital transformation initiatives include production monitoring and cloud-based ordering.",
+]
+
+
+def report_body(rng, body_chars):
+    """리포트 생성 프롬프트와 같은 구조의 마크다운 본문을 대략 body_chars 길이로 만듭니다."""
+    sections = ["Company Overview", "Core Competencies & Technologies", "SWOT Analysis",
+                "Subsidy & Financial Reliability", "Frequently Asked Questions (FAQ)"]
+    parts = [f"> **Analyst's Executive Summary**: {rng.choice(SENTENCES)} {rng.choice(SENTENCES)}\n"]
+    length = len(parts[0])
+    k = 0
+    while length < body_chars:
+        section = sections[k % len(sections)]
+        if section == "SWOT Analysis":
+            text = (f"## {section}\n\n| Category | Details |\n| :--- | :--- |\n"
+                    + "".join(f"| **{c}** | {rng.choice(SENTENCES)} |\n" for c in ("Strengths", "Weaknesses", "Opportunities", "Threats")))
+        else:
+            text = f"## {section}\n\n" + " ".join(rng.choice(SENTENCES) for _ in range(4)) + "\n"
+        parts.append(text)
+        length += len(text) + 1
+        k += 1
+    return "\n".join(parts)
+
+
+def generate_catalog(root, size, body_chars, seed):
+    """root 아래에 size 개 리포트와 10% 더 많은 행의 CSV 를 만듭니다. 같은 설정의 카탈로그가 있으면 재사용."""
+    marker_path = os.path.join(root, "catalog.json")
+    marker = {"version": CATALOG_VERSION, "size": size, "body_chars": body_chars, "seed": seed}
+    if os.path.exists(marker_path):
+        with open(marker_path, 'r', encoding='utf-8') as f:
+            if json.load(f) == marker:
+                return False
+
+    content_dir = os.path.join(root, "content")
+    data_dir = os.path.join(root, "data")
+    for path in (content_dir, data_dir, os.path.join(root, "sitemap")):
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+
+    rng = random.Random(seed)
+    total_rows = size + size // 10
+    csv_lines = ["corporate_number,name,location,subsidy_count,subsidy_titles"]
+    for i in range(total_rows):
+        number = 1000000000000 + i * 7
+        (p_jp, p_en), (c_jp, c_en) = rng.choice(NAME_PREFIXES), rng.choice(NAME_CORES)
+        name = f"株式会社{p_jp}{c_jp}" if i % 3 else f"{p_jp}{c_jp}株式会社"
+        name_en = f"{p_en} {c_en} Co., Ltd."
+        prefecture, cities = rng.choice(LOCATIONS)
+        address = f"{prefecture}{rng.choice(cities)}{rng.randint(1, 9)}-{rng.randint(1, 30)}-{rng.randint(1, 20)}"
+        subsidies = rng.choice((0, 0, 0, 1, 1, 2, 3, 5))
+        titles = "ものづくり補助金" if subsidies else ""
+        csv_lines.append(f"{number},{name},{address},{subsidies},{titles}")
+        if i >= size:
+            continue
+
+        slug = name_en.lower().replace(",", "").replace(".", "").replace(" ", "-")
+        metadata = {
+            "address": address,
+            "category": rng.choice(CATEGORIES),
+            "contact": f"https://www.google.com/search?q={name}+contact+website",
+            "id": f"jp_{number}",
+            "subsidies": subsidies,
+            "title": name,
+            "title_en": name_en,
+        }
+        # JSON 문자열은 YAML 에서도 유효한 스칼라이므로 frontmatter.dumps 없이 빠르게 기록
+        header = "".join(f"{k}: {json.dumps(v, ensure_ascii=False)}\n" for k, v in metadata.items())
+        with open(os.path.join(content_dir, f"jp_{number}_{slug}.md"), 'w', encoding='utf-8') as f:
+            f.write(f"---\n{header}---\n\n{report_body(rng, body_chars)}")
+
+    with open(os.path.join(data_dir, "Total_Premium_Japan_SMEs.csv"), 'w', encoding='utf-8') as f:
+        f.write("\n".join(csv_lines) + "\n")
+    with open(marker_path, 'w', encoding='utf-8') as f:
+        json.dump(marker, f)
+    return True
+
+
+def catalog_env(root):
+    env = dict(os.environ)
+    env["COMPANYDB_DATA_DIR"] = os.path.join(root, "data")
+    env["COMPANYDB_CONTENT_DIR"] = os.path.join(root, "content")
+    env["COMPANYDB_SITEMAP_DIR"] = os.path.join(root, "sitemap")
+    return env
+
+
+# --- 측정 ---
+
+def summarize(times):
+    times = sorted(times)
+    return {
+        "runs": len(times),
+        "min_ms": round(times[0] * 1000, 3),
+        "median_ms": round(statistics.median(times) * 1000, 3),
+        "p95_ms": round(times[min(len(times) - 1, int(len(times) * 0.95))] * 1000, 3),
+        "mean_ms": round(statistics.fmean(times) * 1000, 3),
+    }
+
+
+def measure(fn, repeat, args_list=None):
+    """fn 을 repeat 번 실행한 시간 통계. args_list 를 주면 매번 다른 인자로 호출합니다."""
+    times = []
+    for k in range(repeat):
+        args = args_list[k % len(args_list)] if args_list else ()
+        started = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - started)
+    return summarize(times)
+
+
+def quiet(fn, *args, **kwargs):
+    """빌드 함수의 진행 로그를 숨기고 실행합니다."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def max_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def run_worker(size, repeat):
+    """(하위 프로세스) 환경 변수가 가리키는 카탈로그로 각 단계를 측정해 dict 로 반환합니다."""
+    sys.path.append(BASE_DIR)
+    import pandas as pd
+    import build_data
+    from app.config import CSV_PATH, CONTENT_DIR, DAILY_LIMIT
+
+    steps = {}
+
+    # 1. 빌드: 전체 인덱싱 (+ 사이트맵) 과 변경 없는 증분 인덱싱
+    started = time.perf_counter()
+    quiet(build_data.update_index_and_sitemap, full=True)
+    steps["build_index_full"] = summarize([time.perf_counter() - started])
+    steps["build_index_incremental"] = measure(lambda: quiet(build_data.update_index_and_sitemap), max(1, repeat // 10))
+
+    # 2. 신규 생성 대상 선정 (CSV 는 한 번만 읽음)
+    started = time.perf_counter()
+    df = pd.read_csv(CSV_PATH)
+    steps["targets_read_csv"] = summarize([time.perf_counter() - started])
+    steps["targets_select"] = measure(
+        lambda: build_data.select_new_targets(df, build_data.get_existing_corporate_numbers(), DAILY_LIMIT), repeat
+    )
+    steps["targets_select_priority"] = measure(
+        lambda: build_data.select_new_targets(df, build_data.get_existing_corporate_numbers(), DAILY_LIMIT, "subsidy_count"), repeat
+    )
+
+    # 3. 서빙: ASGI 앱을 TestClient 로 프로세스 내에서 호출
+    started = time.perf_counter()
+    import app.main as main
+    from fastapi.testclient import TestClient
+    steps["app_import"] = summarize([time.perf_counter() - started])
+    # 백그라운드 사전 변환이 측정에 섞이지 않도록 끔
+    main.RENDER_CACHE_PREWARM = 0
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()), TestClient(main.app) as client:
+        steps["app_startup"] = summarize([time.perf_counter() - started])
+        records = main.get_index_data()
+        assert len(records) == size, f"index has {len(records)} records, expected {size}"
+
+        def get(url, status=200):
+            response = client.get(url, follow_redirects=False)
+            assert response.status_code == status, f"{url} -> {response.status_code}"
+
+        steps["get_index_data"] = measure(main.get_index_data, repeat)
+        sample = records[len(records) // 2]
+        queries = {
+            "search_common_jp": "工業",
+            "search_common_en": "precision",
+            "search_rare": sample.n,
+            "search_single_char": "電",
+            "search_no_match": "zzzz",
+        }
+        for name, q in queries.items():
+            steps[name] = measure(get, repeat, [(f"/search?q={q}",)])
+        steps["category_hub"] = measure(get, repeat, [("/category/technology",)])
+        steps["location_hub"] = measure(get, repeat, [("/location/tokyo",)])
+        steps["location_category_hub"] = measure(get, repeat, [("/location/osaka/manufacturing",)])
+
+        # 상세: 캐시 적중(같은 기업 반복), 미적중(매번 다른 기업 -> 마크다운 변환), 짧은 URL 리다이렉트
+        get(f"/company/{sample.file}")
+        steps["company_hit"] = measure(get, repeat, [(f"/company/{sample.file}",)])
+        misses = [(f"/company/{records[k].file}",) for k in range(min(repeat, len(records)))]
+        steps["company_miss"] = measure(get, len(misses), misses)
+        redirects = [(f"/company/{records[k].id}", 301) for k in range(min(repeat, len(records)))]
+        steps["company_redirect"] = measure(get, len(redirects), redirects)
+        steps["company_not_found"] = measure(get, repeat, [("/company/jp_0_missing", 404)])
+
+    return {
+        "companies": size,
+        "content_files": len(os.listdir(CONTENT_DIR)),
+        "max_rss_mb": max_rss_mb(),
+        "steps": steps,
+    }
+
+
+# --- 비교 ---
+
+def compare(current, baseline, threshold):
+    """두 결과의 단계별 중앙값을 비교해 출력하고, threshold 배 이상 느려진 단계 목록을 반환합니다."""
+    regressions = []
+    for size, result in current["sizes"].items():
+        base = baseline.get("sizes", {}).get(size)
+        if not base:
+            continue
+        print(f"\n[{size} companies] step: baseline -> current (median ms)")
+        for step, stats in result["steps"].items():
+            before = base["steps"].get(step)
+            if not before or not before["median_ms"]:
+                continue
+            ratio = stats["median_ms"] / before["median_ms"]
+            flag = "  ⚠️ REGRESSION" if ratio >= threshold else ""
+            print(f"  {step:28s} {before['median_ms']:10.2f} -> {stats['median_ms']:10.2f}  x{ratio:.2f}{flag}")
+            if flag:
+                regressions.append((size, step, ratio))
+    return regressions
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CompanyDB 벤치마크 (서빙 라우트 + 빌드 파이프라인)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 500000], help="카탈로그 기업 수 목록")
+    parser.add_argument("--workdir", default=os.path.join(BASE_DIR, ".benchmark"), help="합성 카탈로그를 보관할 폴더 (재사용)")
+    parser.add_argument("--body-chars", type=int, default=4000, help="리포트 본문 길이 (문자 수)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=20, help="단계별 반복 측정 횟수")
+    parser.add_argument("--out", default="benchmark.json", help="결과 JSON 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON (느려진 단계가 있으면 종료 코드 1)")
+    parser.add_argument("--threshold", type=float, default=1.25, help="회귀로 판단할 중앙값 배율")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        # 하위 프로세스: 결과를 stdout 마지막 줄에 JSON 으로 출력
+        print(json.dumps(run_worker(args.worker, args.repeat)))
+        sys.exit(0)
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "body_chars": args.body_chars,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "sizes": {},
+    }
+
+    for size in args.sizes:
+        root = os.path.join(args.workdir, f"catalog-{size}")
+        os.makedirs(root, exist_ok=True)
+        started = time.perf_counter()
+        created = generate_catalog(root, size, args.body_chars, args.seed)
+        action = "생성" if created else "재사용"
+        print(f"📦 {size:,}개 카탈로그 {action} ({time.perf_counter() - started:.1f}s) -> {root}")
+
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", str(size), "--repeat", str(args.repeat)],
+            env=catalog_env(root), capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            print(proc.stdout[-2000:], proc.stderr[-4000:])
+            sys.exit(f"❌ {size:,}개 카탈로그 측정 실패")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        results["sizes"][str(size)] = result
+
+        for step, stats in result["steps"].items():
+            print(f"   {step:28s} median {stats['median_ms']:10.2f} ms   p95 {stats['p95_ms']:10.2f} ms")
+        print(f"   max RSS {result['max_rss_mb']} MB")
+
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ 결과 저장 -> {args.out}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n⚠️ {len(regressions)}개 단계가 {args.threshold}배 이상 느려졌습니다.")
+            sys.exit(1)
@@ -6,28 +6,154 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import pandas as pd
 import frontmatter
-import google.generativeai as genai
 from dotenv import load_dotenv
 import re
 import json
 from datetime import datetime
 import argparse
-import concurrent.futures  # 멀티스레딩을 위한 모듈 추가
+import asyncio
+import concurrent.futures  # 멀티프로세싱(사전 변환)을 위한 모듈
+import hashlib
+import glob
+import gzip
+import shutil
+from xml.sax.saxutils import escape
 
 # app/config.py 에서 설정 가져오기
 from app.config import (
-    CSV_PATH, CONTENT_DIR, DATA_DIR, INDEX_PATH, 
-    SITEMAP_PATH, DOMAIN, DAILY_LIMIT, CATEGORIES
+    BASE_DIR, CSV_PATH, CONTENT_DIR, DATA_DIR, INDEX_PATH, 
+    SITEMAP_PATH, DOMAIN, DAILY_LIMIT, CATEGORIES,
+    RENDERED_DIR, RENDER_MANIFEST_PATH, INDEX_MANIFEST_PATH,
+    SITEMAP_DIR, SITEMAP_MAX_URLS, SITEMAP_GZIP, HUB_DATA, INDEX_BIN_PATH,
+    STATIC_DIR, TEMPLATE_DIR, EXPORT_DIR, EXPORT_MANIFEST_PATH
 )
+from app.rendering import prerender_report
+from app.index_store import IndexStore
+from app.http_cache import get_template_version
+from app.pages import (
+    ROBOTS_TXT, STATIC_PAGES, home_context, iter_hub_pages, hub_is_paginated, hub_letter_pages,
+    render_page, export_path, write_page, export_company_pages
+)
+from app.columnar import write_columnar
+from app.records import ListTable, to_company
+from app.hubs import build_category_hubs, build_prefecture_index, build_location_hubs
+from pipeline import GeminiClient, FakeModelClient, JobJournal, run_pipeline
+from response_cache import ResponseCache
+from frontmatter_scan import scan_headers, HEADER_SCAN_VERSION
 
 # --- AI 설정 ---
 load_dotenv()
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-MODEL = genai.GenerativeModel('gemini-2.5-flash') # 최신 모델로 변경 (원하시면 gemini-1.5-flash 유지)
+MODEL_NAME = 'gemini-2.5-flash' # 최신 모델로 변경 (원하시면 gemini-1.5-flash 유지)
+
+# --- 생성 파이프라인 흐름 제어 ---
+# 초당 요청 수 상한과 순간 허용량 (토큰 버킷)
+RATE_PER_SEC = 5.0
+RATE_BURST = 10
+# 동시에 처리할 요청 수. 오류/지연에 따라 MIN~MAX 사이에서 자동 조절됩니다.
+# 너무 높이면 구글 쪽에서 차단할 수 있으므로 최대값은 10~20 사이를 추천합니다.
+INITIAL_CONCURRENCY = 8
+MIN_CONCURRENCY = 2
+MAX_CONCURRENCY = 15
+# 이 지연(초)을 넘기면 동시성을 늘리지 않고, 두 배를 넘기면 절반으로 줄임
+TARGET_LATENCY = 30.0
+REQUEST_TIMEOUT = 120.0
+MAX_RETRIES = 5
+# 중단된 daily 실행을 이어서 처리하기 위한 작업 저널
+JOURNAL_PATH = os.path.join(DATA_DIR, "generation_journal.jsonl")
+# frontmatter 병렬 스캔 시 프로세스 하나가 한 번에 처리할 파일 수
+SCAN_CHUNK_SIZE = 256
+# 카테고리 마이그레이션 시 한 번의 요청에 묶어 분류할 기업 수 (1 이면 기업마다 개별 요청)
+MIGRATION_BATCH_SIZE = 20
+
+# --- 모델 응답 캐시 ---
+# 모델 이름 + 프롬프트 해시로 응답을 저장하여, 같은 입력의 재실행은 API 를 호출하지 않음
+RESPONSE_CACHE_PATH = os.path.join(DATA_DIR, "response_cache.sqlite3")
+RESPONSE_CACHE_TTL = 90 * 24 * 3600  # 초 (90일)
+RESPONSE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+def get_model_client(fake=False):
+    """실제 Gemini 클라이언트 또는 API 를 호출하지 않는 로컬 가짜 클라이언트."""
+    return FakeModelClient() if fake else GeminiClient(MODEL_NAME)
+
+def get_fake_output_conflicts():
+    """--fake 실행이 쓰면 안 되는 기본(실제 서비스) 경로 중 현재 설정된 것들의 환경 변수 이름.
+
+    가짜 리포트가 실제 콘텐츠에 섞이면 해당 기업이 생성 완료로 취급되어 다시 생성되지 않고,
+    같은 실행에서 인덱스/사이트맵에도 올라가므로 별도 폴더에서만 실행하도록 합니다.
+    """
+    defaults = [
+        ("COMPANYDB_CONTENT_DIR", CONTENT_DIR, os.path.join(BASE_DIR, "app", "content")),
+        ("COMPANYDB_DATA_DIR", DATA_DIR, os.path.join(BASE_DIR, "data")),
+        ("COMPANYDB_SITEMAP_DIR", SITEMAP_DIR, STATIC_DIR),
+    ]
+    return [
+        name for name, path, default in defaults
+        if os.path.realpath(path) == os.path.realpath(default)
+    ]
+
+def get_model_name(fake=False):
+    return FakeModelClient.model_name if fake else MODEL_NAME
+
+def open_response_cache(enabled=True):
+    if not enabled:
+        return None
+    return ResponseCache(RESPONSE_CACHE_PATH, ttl=RESPONSE_CACHE_TTL, max_bytes=RESPONSE_CACHE_MAX_BYTES)
+
+def run_model_jobs(jobs, kind, build_prompt, apply_response, fake=False, cache=None, journal=None, indent=""):
+    """모델 호출 작업들을 속도 제한/재시도가 적용된 비동기 파이프라인으로 실행합니다.
+
+    jobs 는 (job_id, payload) 목록이며 payload 는 JSON 으로 저장 가능한 dict 여야 합니다.
+    build_prompt(payload) 로 프롬프트를 만들고, 응답은 apply_response(payload, text) 로 저장합니다.
+    캐시에 같은 모델/프롬프트의 응답이 있으면 API 를 호출하지 않고 바로 적용합니다.
+    """
+    model_name = get_model_name(fake)
+    pending = []
+    cached_count = 0
+    for job_id, payload in jobs:
+        prompt = build_prompt(payload)
+        text = cache.get(model_name, prompt) if cache is not None else None
+        if text is not None:
+            try:
+                message = apply_response(payload, text)
+            except Exception as e:
+                # 저장된 응답을 적용하지 못하면 API 로 다시 요청
+                print(f"{indent}⚠️ 캐시 응답 적용 실패 ({job_id}): {e}")
+            else:
+                cached_count += 1
+                if journal is not None:
+                    journal.mark_done(job_id)
+                print(f"{indent}[ 캐시 ] {message}")
+                continue
+        pending.append((job_id, (job_id, payload, prompt)))
+
+    if cached_count:
+        print(f"{indent}💾 캐시된 응답 {cached_count}건 적용, API 호출 {len(pending)}건")
+
+    async def handler(client, job):
+        job_id, payload, prompt = job
+        text = await client.generate(prompt)
+        if cache is not None:
+            cache.put(model_name, prompt, text, kind=kind, job_id=job_id, payload=payload)
+        return apply_response(payload, text)
 
-# 유료 API를 사용할 때 동시에 처리할 작업(스레드) 개수 설정
-# 너무 높이면 구글 쪽에서 차단할 수 있으므로 10~20 사이를 추천합니다.
-MAX_WORKERS = 15
+    def on_result(i, total, ok, msg):
+        print(f"{indent}[ {i} / {total} ] {msg}")
+
+    success_count = 0
+    if pending:
+        success_count = asyncio.run(run_pipeline(
+            pending, handler, get_model_client(fake),
+            rate=RATE_PER_SEC, burst=RATE_BURST,
+            concurrency=INITIAL_CONCURRENCY, min_concurrency=MIN_CONCURRENCY, max_concurrency=MAX_CONCURRENCY,
+            target_latency=TARGET_LATENCY, timeout=REQUEST_TIMEOUT, max_retries=MAX_RETRIES,
+            journal=journal, on_result=on_result
+        ))
+    elif journal is not None:
+        journal.finish()
+
+    if cache is not None:
+        cache.evict()
+    return cached_count + success_count
 
 # --- 헬퍼 함수 ---
 def slugify(text):
@@ -35,11 +161,38 @@ def slugify(text):
     text = re.sub(r'[^a-z0-9]+', '-', text)
     return text.strip('-')
 
-# --- 개별 기업 처리 함수 (멀티스레딩용) ---
-def process_single_company(row):
-    cid = f"jp_{row['corporate_number']}"
-    
-    prompt = f"""
+# 리포트 파일명에서 법인번호 추출 (jp_<번호>.md 또는 jp_<번호>_<슬러그>.md)
+REPORT_FILE_RE = re.compile(r'^jp_(\d+)(?:_.*)?\.md$')
+
+def get_existing_corporate_numbers():
+    """이미 리포트가 생성된 법인번호 집합 (디렉터리 목록 1회)."""
+    numbers = set()
+    for filename in os.listdir(CONTENT_DIR):
+        m = REPORT_FILE_RE.match(filename)
+        if m:
+            numbers.add(m.group(1))
+    return numbers
+
+def select_new_targets(df, existing_numbers, limit, priority=None):
+    """리포트가 없는 행을 골라 최대 limit 개 반환합니다.
+
+    priority 컬럼(예: subsidy_count)을 주면 값이 큰 순으로, 없으면 CSV 순서대로 고릅니다.
+    """
+    candidates = df[~df['corporate_number'].astype(str).isin(existing_numbers)]
+    if priority:
+        candidates = candidates.sort_values(priority, ascending=False, kind='stable')
+    return candidates.head(limit)
+
+def write_atomic(path, content):
+    """임시 파일에 쓴 뒤 교체하여, 서버가 쓰는 도중의 파일을 읽지 않도록 합니다."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+# --- 개별 기업 처리 함수 ---
+def build_company_prompt(row):
+    return f"""
         Act as a Senior B2B Business Analyst. Analyze the following Japanese company and write a comprehensive, highly structured B2B intelligence report in English.
 
         - Company Name: {row['name']}
@@ -87,125 +240,186 @@ def process_single_company(row):
         **Q5: What is the significance of their government subsidies or regional verification?**
         A5: ...
         """
-    
-    try:
-        response = MODEL.generate_content(prompt)
-        full_response = response.text.strip()
 
-        if "---BODY---" in full_response:
-            header_part, ai_content = full_response.split("---BODY---", 1)
-        else:
-            lines = full_response.split('\n')
-            header_part = lines[0]
-            ai_content = "\n".join(lines[1:])
+def save_company_report(row, full_response):
+    """모델 응답을 파싱하여 .md 리포트로 저장하고 출력용 메시지를 반환합니다."""
+    cid = f"jp_{row['corporate_number']}"
+    full_response = full_response.strip()
 
-        header_lines = header_part.strip().split('\n')
-        ai_en_name = header_lines[0].strip()
-        
-        ai_category = "Services"
-        if len(header_lines) > 1 and "Category:" in header_lines[1]:
-            ai_category = header_lines[1].replace("Category:", "").strip()
-            if ai_category not in CATEGORIES:
-                ai_category = "Services"
-
-        if not ai_en_name.isascii():
-            ai_en_name = str(row['name'])
-
-        file_slug = slugify(ai_en_name)
-        file_name = f"{cid}_{file_slug}.md" if file_slug else f"{cid}.md"
-        file_path = os.path.join(CONTENT_DIR, file_name)
-
-        metadata = {
-            "id": cid,
-            "title": str(row['name']),
-            "title_en": ai_en_name,
-            "address": str(row['location']),
-            "subsidies": int(row['subsidy_count']),
-            "category": ai_category,
-            "contact": f"https://www.google.com/search?q={row['name']}+contact+website"
-        }
-        
-        post = frontmatter.Post(ai_content.strip(), **metadata)
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(frontmatter.dumps(post))
-        
-        return True, f"✅ 완료: {file_name} (Category: {ai_category})"
-        
-    except Exception as e:
-        return False, f"❌ 에러 발생 ({row['name']}): {e}"
+    if "---BODY---" in full_response:
+        header_part, ai_content = full_response.split("---BODY---", 1)
+    else:
+        lines = full_response.split('\n')
+        header_part = lines[0]
+        ai_content = "\n".join(lines[1:])
+
+    header_lines = header_part.strip().split('\n')
+    ai_en_name = header_lines[0].strip()
+
+    ai_category = "Services"
+    if len(header_lines) > 1 and "Category:" in header_lines[1]:
+        ai_category = header_lines[1].replace("Category:", "").strip()
+        if ai_category not in CATEGORIES:
+            ai_category = "Services"
+
+    if not ai_en_name.isascii():
+        ai_en_name = str(row['name'])
+
+    file_slug = slugify(ai_en_name)
+    file_name = f"{cid}_{file_slug}.md" if file_slug else f"{cid}.md"
+    file_path = os.path.join(CONTENT_DIR, file_name)
+
+    metadata = {
+        "id": cid,
+        "title": str(row['name']),
+        "title_en": ai_en_name,
+        "address": str(row['location']),
+        "subsidies": int(row['subsidy_count']),
+        "category": ai_category,
+        "contact": f"https://www.google.com/search?q={row['name']}+contact+website"
+    }
+
+    post = frontmatter.Post(ai_content.strip(), **metadata)
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(frontmatter.dumps(post))
+
+    return f"✅ 완료: {file_name} (Category: {ai_category})"
+
+def company_payload(row):
+    """CSV 행을 캐시에 저장 가능한 dict 로 변환 (NaN -> None)."""
+    return json.loads(row.to_json())
 
 # --- 핵심 기능 함수들 ---
 
-def generate_new_content():
-    """(Daily Task) CSV를 읽어 새로운 .md 리포트를 생성합니다. (멀티스레딩 적용)"""
+def generate_new_content(fake=False, priority=None, use_cache=True):
+    """(Daily Task) CSV를 읽어 새로운 .md 리포트를 생성합니다. (비동기 파이프라인, 중단 시 이어서 처리)"""
     if not os.path.exists(CSV_PATH):
         print(f"❌ 원본 데이터 파일이 없습니다: {CSV_PATH}")
         return
 
     df = pd.read_csv(CSV_PATH)
     os.makedirs(CONTENT_DIR, exist_ok=True)
-    
-    existing_files = os.listdir(CONTENT_DIR)
-    
-    # 이미 생성된 파일 제외하고 처리할 목록 추리기
-    targets =[]
-    for _, row in df.iterrows():
-        cid = f"jp_{row['corporate_number']}"
-        if not any(f.startswith(cid) for f in existing_files):
-            targets.append(row)
-            if len(targets) >= DAILY_LIMIT:
-                break
+
+    journal = JobJournal(JOURNAL_PATH)
+    resumed_ids = journal.pending()
+
+    if resumed_ids:
+        # 이전 실행이 중단되었으면 그 실행의 남은 대상부터 처리
+        print(f"♻️ 중단된 이전 실행을 이어서 처리합니다 ({len(resumed_ids)}개 남음)")
+        df['id'] = 'jp_' + df['corporate_number'].astype(str)
+        rows = {row['id']: row for _, row in df[df['id'].isin(resumed_ids)].iterrows()}
+        targets = [rows[cid] for cid in resumed_ids if cid in rows]
+    else:
+        if priority and priority not in df.columns:
+            print(f"❌ 우선순위 컬럼이 CSV 에 없습니다: {priority}")
+            return
+
+        # 이미 생성된 파일 제외하고 처리할 목록 추리기 (집합 + isin 으로 한 번에 필터링)
+        selected = select_new_targets(df, get_existing_corporate_numbers(), DAILY_LIMIT, priority)
+        targets = [row for _, row in selected.iterrows()]
+
+        if targets:
+            journal.start([f"jp_{row['corporate_number']}" for row in targets])
                 
     if not targets:
         print("생성할 새로운 기업이 없습니다.")
         return
         
-    print(f"🚀 총 {len(targets)}개 기업 리포트를 {MAX_WORKERS}개의 스레드로 동시 생성합니다...")
-
-    success_count = 0
-    # ThreadPoolExecutor를 이용한 병렬 처리
-    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        # 작업들을 스레드풀에 던짐
-        futures = {executor.submit(process_single_company, row): row for row in targets}
-        
-        # 완료되는 순서대로 결과 출력
-        for i, future in enumerate(concurrent.futures.as_completed(futures)):
-            is_success, msg = future.result()
-            print(f"[ {i+1} / {len(targets)} ] {msg}")
-            if is_success:
-                success_count += 1
+    print(f"🚀 총 {len(targets)}개 기업 리포트를 생성합니다... (초당 {RATE_PER_SEC}건, 동시 {MIN_CONCURRENCY}~{MAX_CONCURRENCY}건)")
+
+    jobs = [(f"jp_{row['corporate_number']}", company_payload(row)) for row in targets]
+    cache = open_response_cache(use_cache)
+    success_count = run_model_jobs(
+        jobs, "company", build_company_prompt, save_company_report,
+        fake=fake, cache=cache, journal=journal
+    )
+    if cache is not None:
+        cache.close()
                 
     print(f"\n🎉 {success_count}개 기업 생성 완료!")
 
-# --- 개별 카테고리 마이그레이션 함수 (멀티스레딩용) ---
-def process_single_migration(file_path, filename, row):
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            post = frontmatter.load(f)
-        
-        prompt = f"""
+# --- 개별 카테고리 마이그레이션 함수 ---
+def read_report_excerpt(filename, length=500):
+    with open(os.path.join(CONTENT_DIR, filename), 'r', encoding='utf-8') as f:
+        post = frontmatter.load(f)
+    return post.content[:length]
+
+def write_report_category(filename, category):
+    file_path = os.path.join(CONTENT_DIR, filename)
+    with open(file_path, 'r', encoding='utf-8') as f:
+        post = frontmatter.load(f)
+    post.metadata['category'] = category
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(frontmatter.dumps(post))
+
+def build_migration_prompt(target):
+    return f"""
         Analyze the company info and choose ONE category from: {', '.join(CATEGORIES)}.
-        - Company: {row['name']}
-        - Info: {post.content[:500]}
+        - Company: {target['name']}
+        - Info: {read_report_excerpt(target['file'])}
         Output ONLY the chosen category name.
         """
+
+def save_migration_category(target, response):
+    """모델이 고른 카테고리를 리포트의 frontmatter 에 기록합니다."""
+    ai_category = response.strip()
+    
+    if ai_category not in CATEGORIES:
+        ai_category = "Services"
+    
+    write_report_category(target['file'], ai_category)
         
-        response = MODEL.generate_content(prompt)
-        ai_category = response.text.strip()
-        
-        if ai_category not in CATEGORIES:
-            ai_category = "Services"
-        
-        post.metadata['category'] = ai_category
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(frontmatter.dumps(post))
-            
-        return True, f"✅ 완료. 카테고리: {ai_category} ({filename})"
-    except Exception as e:
-        return False, f"❌ 에러 발생 ({filename}): {e}"
+    return f"✅ 완료. 카테고리: {ai_category} ({target['file']})"
 
-def migrate_missing_categories():
-    """(Migration Task) 기존 .md 파일에 카테고리 정보가 없으면 추가합니다. (멀티스레딩 적용)"""
+def build_migration_batch_prompt(batch):
+    companies = "\n".join(
+        f"        [{i}] Company: {target['name']}\n"
+        f"            Info: {' '.join(read_report_excerpt(target['file']).split())}"
+        for i, target in enumerate(batch['items'])
+    )
+    return f"""
+        Analyze each company below and choose ONE category for each from: {', '.join(CATEGORIES)}.
+
+{companies}
+
+        Output ONLY a JSON array with one object per company, in the same order, e.g.
+        [{{"id": 0, "category": "Manufacturing"}}, {{"id": 1, "category": "Services"}}]
+        """
+
+def parse_category_batch(response, count):
+    """배치 응답(JSON 배열)을 {번호: 카테고리} 로 변환합니다. CATEGORIES 에 없는 답은 제외."""
+    m = re.search(r'\[.*\]', response, re.S)
+    try:
+        items = json.loads(m.group(0)) if m else []
+    except ValueError:
+        return {}
+    if not isinstance(items, list):
+        return {}
+
+    answers = {}
+    for position, item in enumerate(items):
+        if isinstance(item, dict):
+            i, category = item.get('id', position), item.get('category')
+        else:
+            i, category = position, item
+        if isinstance(i, int) and 0 <= i < count and isinstance(category, str) and category.strip() in CATEGORIES:
+            answers[i] = category.strip()
+    return answers
+
+def save_migration_batch(batch, response):
+    """배치 응답 중 검증된 카테고리만 기록합니다. (실패한 기업 파일명 목록도 함께 반환)"""
+    items = batch['items']
+    answers = parse_category_batch(response, len(items))
+    for i, category in answers.items():
+        write_report_category(items[i]['file'], category)
+    failed = [target['file'] for i, target in enumerate(items) if i not in answers]
+    return f"✅ 배치 완료: {len(answers)} / {len(items)}개 분류 ({items[0]['file']} ...)", failed
+
+def migrate_missing_categories(fake=False, use_cache=True, batch_size=MIGRATION_BATCH_SIZE):
+    """(Migration Task) 기존 .md 파일에 카테고리 정보가 없으면 추가합니다. (비동기 파이프라인)
+
+    batch_size 개씩 묶어 한 번에 분류하고, 배치에서 유효한 답을 얻지 못한 기업만 개별 요청으로 다시 분류합니다.
+    """
     print("🚀 기존 마크다운 파일 카테고리 마이그레이션을 시작합니다...")
     if not os.path.exists(CSV_PATH):
         print(f"❌ 원본 데이터 파일({CSV_PATH})을 찾을 수 없어 중단합니다.")
@@ -218,106 +432,516 @@ def migrate_missing_categories():
 
     files_to_update =[f for f in os.listdir(CONTENT_DIR) if f.endswith('.md')]
     targets =[]
+    headers = scan_headers((os.path.join(CONTENT_DIR, f) for f in files_to_update), chunk_size=SCAN_CHUNK_SIZE)
     
-    for filename in files_to_update:
-        file_path = os.path.join(CONTENT_DIR, filename)
-        with open(file_path, 'r', encoding='utf-8') as f:
-            post = frontmatter.load(f)
+    for filename, (metadata, error) in zip(files_to_update, headers):
+        if error:
+            print(f"⚠️ {filename} 처리 중 오류: {error}")
+            continue
             
-        if 'category' not in post.metadata or post.metadata['category'] not in CATEGORIES:
-            company_id = post.metadata.get('id')
+        if 'category' not in metadata or metadata['category'] not in CATEGORIES:
+            company_id = metadata.get('id')
             if company_id and company_id in company_data_map:
-                targets.append((file_path, filename, company_data_map[company_id]))
+                targets.append({"file": filename, "name": str(company_data_map[company_id]['name'])})
 
     if not targets:
         print("모든 파일에 이미 유효한 카테고리가 존재합니다.")
         return
 
-    print(f"총 {len(targets)}개의 파일을 {MAX_WORKERS}개의 스레드로 분류합니다...")
+    print(f"총 {len(targets)}개의 파일을 분류합니다... (초당 {RATE_PER_SEC}건, 동시 {MIN_CONCURRENCY}~{MAX_CONCURRENCY}건)")
 
+    cache = open_response_cache(use_cache)
     success_count = 0
-    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {executor.submit(process_single_migration, t[0], t[1], t[2]): t for t in targets}
-        
-        for i, future in enumerate(concurrent.futures.as_completed(futures)):
-            is_success, msg = future.result()
-            print(f"   [ {i+1} / {len(targets)} ] {msg}")
-            if is_success:
-                success_count += 1
+
+    if batch_size > 1:
+        classified = set()
+
+        def apply_batch(batch, response):
+            message, failed = save_migration_batch(batch, response)
+            classified.update(t['file'] for t in batch['items'] if t['file'] not in failed)
+            return message
+
+        batches = [targets[i:i + batch_size] for i in range(0, len(targets), batch_size)]
+        print(f"   📦 {len(batches)}개 배치로 분류합니다 (배치당 최대 {batch_size}개)")
+        jobs = [(f"batch:{b[0]['file']}", {"items": b}) for b in batches]
+        run_model_jobs(
+            jobs, "category_batch", build_migration_batch_prompt, apply_batch,
+            fake=fake, cache=cache, indent="   "
+        )
+        success_count = len(classified)
+        # 배치에서 빠졌거나 검증에 실패한 기업은 개별 요청으로 분류
+        targets = [t for t in targets if t['file'] not in classified]
+        if targets:
+            print(f"   🔁 배치로 분류하지 못한 {len(targets)}개는 개별 요청으로 다시 분류합니다")
+
+    if targets:
+        jobs = [(t['file'], t) for t in targets]
+        success_count += run_model_jobs(
+            jobs, "category", build_migration_prompt, save_migration_category,
+            fake=fake, cache=cache, indent="   "
+        )
+    if cache is not None:
+        cache.close()
                 
     print(f"\n✅ 총 {success_count}개의 파일에 카테고리를 추가했습니다.")
 
+# 캐시 항목의 작업 종류 -> 응답 적용 함수 (reparse 용)
+RESPONSE_HANDLERS = {
+    "company": save_company_report,
+    "category": save_migration_category,
+    "category_batch": lambda batch, response: save_migration_batch(batch, response)[0],
+}
+
+def reparse_cached_responses(fake=False, kind=None):
+    """(Reparse Task) 캐시된 모델 응답을 현재 파싱 로직으로 다시 적용합니다. (API 호출 없음)"""
+    if not os.path.exists(RESPONSE_CACHE_PATH):
+        print(f"⚠️ 응답 캐시가 없습니다: {RESPONSE_CACHE_PATH}")
+        return
 
-def update_index_and_sitemap():
-    """(Final Task) 검색 인덱스와 사이트맵을 최신 상태로 재구성합니다."""
+    model_name = get_model_name(fake)
+    cache = open_response_cache()
+    kinds = [kind] if kind else list(RESPONSE_HANDLERS)
+    for k in kinds:
+        entries = cache.entries(model_name, k)
+        print(f"\n♻️ '{k}' 응답 {len(entries)}건을 다시 적용합니다... (모델: {model_name})")
+        applied = 0
+        for job_id, payload, response in entries:
+            try:
+                RESPONSE_HANDLERS[k](payload, response)
+                applied += 1
+            except Exception as e:
+                print(f"   ⚠️ {job_id} 적용 실패: {e}")
+        print(f"✅ {applied}건 적용 완료")
+    cache.close()
+
+
+class SitemapWriter:
+    """URL 을 받는 즉시 샤드 파일(sitemap-N.xml[.gz])에 기록하는 스트리밍 사이트맵 작성기.
+
+    URL 문자열을 메모리에 모으지 않으므로 기업 수와 관계없이 메모리 사용량이 일정하며,
+    close() 시 각 샤드의 최신 lastmod 를 담은 사이트맵 인덱스를 씁니다.
+    """
+
+    def __init__(self, out_dir, index_path, max_urls=SITEMAP_MAX_URLS, use_gzip=SITEMAP_GZIP):
+        self.out_dir = out_dir
+        self.index_path = index_path
+        self.max_urls = max_urls
+        self.use_gzip = use_gzip
+        self.shards = []  # (파일명, 최신 lastmod)
+        self.url_count = 0
+        self._file = None
+        self._shard_urls = 0
+        self._shard_lastmod = None
+
+    def _shard_name(self, number):
+        return f"sitemap-{number}.xml" + (".gz" if self.use_gzip else "")
+
+    def _open_shard(self):
+        name = self._shard_name(len(self.shards) + 1)
+        tmp_path = os.path.join(self.out_dir, f"{name}.tmp")
+        if self.use_gzip:
+            # mtime=0 으로 고정하여 내용이 같으면 파일도 바이트 단위로 같도록 함
+            self._file = gzip.GzipFile(filename=name[:-3], mode='wb', fileobj=open(tmp_path, 'wb'), mtime=0)
+        else:
+            self._file = open(tmp_path, 'wb')
+        self._write('<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+        self.shards.append([name, None])
+        self._shard_urls = 0
+
+    def _close_shard(self):
+        self._write('</urlset>\n')
+        fileobj = self._file.fileobj if self.use_gzip else None
+        self._file.close()
+        if fileobj is not None:
+            fileobj.close()
+        name = self.shards[-1][0]
+        os.replace(os.path.join(self.out_dir, f"{name}.tmp"), os.path.join(self.out_dir, name))
+        self._file = None
+
+    def _write(self, text):
+        self._file.write(text.encode('utf-8'))
+
+    def add(self, loc, lastmod=None, changefreq=None, priority=None):
+        if self._file is None or self._shard_urls >= self.max_urls:
+            if self._file is not None:
+                self._close_shard()
+            self._open_shard()
+
+        parts = [f"    <url>\n        <loc>{escape(loc)}</loc>\n"]
+        if lastmod:
+            parts.append(f"        <lastmod>{lastmod}</lastmod>\n")
+            shard = self.shards[-1]
+            if shard[1] is None or lastmod > shard[1]:
+                shard[1] = lastmod
+        if changefreq:
+            parts.append(f"        <changefreq>{changefreq}</changefreq>\n")
+        if priority is not None:
+            parts.append(f"        <priority>{priority}</priority>\n")
+        parts.append("    </url>\n")
+        self._write(''.join(parts))
+        self._shard_urls += 1
+        self.url_count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._close_shard()
+
+        lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+        for name, lastmod in self.shards:
+            lines.append("    <sitemap>")
+            lines.append(f"        <loc>{DOMAIN}/{name}</loc>")
+            if lastmod:
+                lines.append(f"        <lastmod>{lastmod}</lastmod>")
+            lines.append("    </sitemap>")
+        lines.append("</sitemapindex>")
+        write_atomic(self.index_path, "\n".join(lines) + "\n")
+
+        # 이전 실행에서 남은 번호가 큰 샤드 (또는 gzip 설정이 바뀐 샤드) 정리
+        current = {name for name, _ in self.shards}
+        for path in glob.glob(os.path.join(self.out_dir, "sitemap-*.xml*")):
+            if os.path.basename(path) not in current:
+                os.remove(path)
+
+
+# 인덱스 레코드 추출 규칙 버전. index_record 가 만드는 레코드가 바뀌면 (필드 추가, 잘라내기 길이 등) 올릴 것
+INDEX_RECORD_VERSION = 1
+
+
+def index_record(file_slug, metadata):
+    """frontmatter 메타데이터 -> 검색 인덱스 레코드."""
+    return {
+        "id": metadata.get('id', ''),
+        "file": file_slug,
+        "n": metadata.get('title', ''),
+        "en": metadata.get('title_en', ''),
+        "l": str(metadata.get('address', ''))[:30],
+        "s": metadata.get('subsidies', 0),
+        "c": metadata.get('category', 'Services')
+    }
+
+
+# 인덱스 매니페스트 버전. 레코드 추출(INDEX_RECORD_VERSION)이나 헤더 파싱(HEADER_SCAN_VERSION) 규칙이
+# 바뀌면 이전 매니페스트의 레코드를 재사용하지 않고 모두 다시 파싱함
+INDEX_MANIFEST_VERSION = f"{INDEX_RECORD_VERSION}.{HEADER_SCAN_VERSION}"
+
+
+def load_index_manifest():
+    """파일명 -> {mtime_ns, size, record}. 버전이 다르거나 없으면 빈 dict."""
+    if not os.path.exists(INDEX_MANIFEST_PATH):
+        return {}
+    with open(INDEX_MANIFEST_PATH, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if not isinstance(manifest, dict) or manifest.get("version") != INDEX_MANIFEST_VERSION:
+        print("ℹ️ 인덱스 매니페스트 버전이 달라 모든 파일을 다시 파싱합니다")
+        return {}
+    return manifest.get("files", {})
+
+
+def iter_hub_sitemap_paths(index_data):
+    """사이트맵에 올릴 허브 페이지의 (URL 경로, priority). 기업이 없는 허브는 제외합니다.
+
+    서버와 같은 허브 구축 함수로 기업 수를 세므로 빈 페이지가 크롤러에 제출되지 않습니다.
+    """
+    records = ListTable([to_company(item) for item in index_data])
+    category_hubs = build_category_hubs(records, records)
+    location_hubs = build_location_hubs(records, records, build_prefecture_index(records))
+    for cat_slug, hub in category_hubs.items():
+        if hub.total_count:
+            yield f"/category/{cat_slug}", "0.9"
+        # 글자별 페이지로 나눈 허브는 기본 페이지에 없는 나머지 글자 페이지도 제출
+        if hub_is_paginated(hub):
+            for letter in hub_letter_pages(hub):
+                yield f"/category/{cat_slug}/{letter}", "0.8"
+    for loc_slug in HUB_DATA["locations"]:
+        if location_hubs[(loc_slug, None)].total_count:
+            yield f"/location/{loc_slug}", "0.9"
+        for cat_slug in HUB_DATA["categories"]:
+            if location_hubs[(loc_slug, cat_slug)].total_count:
+                yield f"/location/{loc_slug}/{cat_slug}", "0.7"
+
+
+def update_index_and_sitemap(full=False):
+    """(Final Task) 검색 인덱스와 사이트맵을 최신 상태로 재구성합니다.
+
+    기본은 증분 모드로, 매니페스트와 mtime/size 가 같은 파일은 다시 파싱하지 않습니다.
+    (매니페스트 버전이 현재 추출 로직과 다르면 전체 모드와 같이 동작)
+    full=True 이면 모든 파일을 다시 파싱합니다. 두 모드의 결과물은 동일합니다.
+    """
     if not os.path.exists(CONTENT_DIR):
         print(f"⚠️ 콘텐츠 폴더가 없습니다: {CONTENT_DIR}")
         return
     
     os.makedirs(DATA_DIR, exist_ok=True)
-    static_dir_path = os.path.dirname(SITEMAP_PATH)
-    os.makedirs(static_dir_path, exist_ok=True)
+    os.makedirs(SITEMAP_DIR, exist_ok=True)
+
+    manifest = {} if full else load_index_manifest()
 
     index_data =[]
-    sitemap_urls =[]
-    
-    print(f"\n🔍 '{CONTENT_DIR}' 폴더를 스캔하여 인덱싱을 시작합니다...")
+    new_manifest = {}
+    parsed_count = 0
     
+    mode = "전체" if full else "증분"
+    print(f"\n🔍 '{CONTENT_DIR}' 폴더를 스캔하여 인덱싱을 시작합니다... ({mode} 모드)")
+
+    # 1. stat 으로 변경된 파일만 골라 frontmatter 헤더를 병렬로 파싱
+    files = []
+    to_parse = []
     for filename in os.listdir(CONTENT_DIR):
         if filename.endswith('.md'):
             try:
-                file_path = os.path.join(CONTENT_DIR, filename)
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    post = frontmatter.load(f)
-                
-                file_slug = filename.replace(".md", "")
-                
-                index_data.append({
-                    "id": post.metadata.get('id', ''),
-                    "file": file_slug,
-                    "n": post.metadata.get('title', ''),
-                    "en": post.metadata.get('title_en', ''),
-                    "l": str(post.metadata.get('address', ''))[:30],
-                    "s": post.metadata.get('subsidies', 0),
-                    "c": post.metadata.get('category', 'Services')
-                })
-
-                mtime = os.path.getmtime(file_path)
-                lastmod = datetime.fromtimestamp(mtime).strftime('%Y-%m-%d')
-                
-                sitemap_urls.append(f"""
-    <url>
-        <loc>{DOMAIN}/company/{file_slug}</loc>
-        <lastmod>{lastmod}</lastmod>
-        <changefreq>weekly</changefreq>
-        <priority>0.8</priority>
-    </url>""")
-            except Exception as e:
+                st = os.stat(os.path.join(CONTENT_DIR, filename))
+            except OSError as e:
                 print(f"⚠️ {filename} 처리 중 오류: {e}")
                 continue
-    
-    with open(INDEX_PATH, 'w', encoding='utf-8') as f:
-        json.dump(index_data, f, ensure_ascii=False, indent=2)
-    print(f"✅ 검색 인덱스 갱신 완료 ({len(index_data)}개 기업)")
-
-    sitemap_content = f"""<?xml version="1.0" encoding="UTF-8"?>
-<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
-    <url>
-        <loc>{DOMAIN}/</loc>
-        <changefreq>daily</changefreq>
-        <priority>1.0</priority>
-    </url>
-    {''.join(sitemap_urls)}
-</urlset>"""
-    
-    with open(SITEMAP_PATH, 'w', encoding='utf-8') as f:
-        f.write(sitemap_content)
-    print(f"✅ 사이트맵 생성 완료 ({len(sitemap_urls)}개 링크) -> {SITEMAP_PATH}")
+            files.append((filename, st))
+            entry = manifest.get(filename)
+            if not (entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size):
+                to_parse.append(filename)
+
+    headers = dict(zip(
+        to_parse,
+        scan_headers((os.path.join(CONTENT_DIR, f) for f in to_parse), chunk_size=SCAN_CHUNK_SIZE)
+    ))
+
+    # 2. 디렉터리 순서대로 레코드를 모음 (사이트맵에는 허브 다음에 기록)
+    company_pages = []
+    for filename, st in files:
+        try:
+            file_slug = filename.replace(".md", "")
+
+            if filename in headers:
+                metadata, error = headers[filename]
+                if error:
+                    raise ValueError(error)
+                record = index_record(file_slug, metadata)
+                parsed_count += 1
+            else:
+                record = manifest[filename]["record"]
+
+            index_data.append(record)
+            new_manifest[filename] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "record": record}
+
+            company_pages.append((file_slug, st.st_mtime))
+        except Exception as e:
+            print(f"⚠️ {filename} 처리 중 오류: {e}")
+            continue
+
+    # 서버(IndexStore)가 mtime 변경을 감지해 핫 리로드하므로 원자적으로 교체
+    write_atomic(INDEX_PATH, json.dumps(index_data, ensure_ascii=False, indent=2))
+    # 서버가 실제로 읽는 컬럼형 인덱스 (JSON 은 내보내기용)
+    write_columnar(INDEX_BIN_PATH, index_data)
+    # 삭제된 파일은 new_manifest 에 없으므로 자동으로 빠짐
+    write_atomic(
+        INDEX_MANIFEST_PATH,
+        json.dumps({"version": INDEX_MANIFEST_VERSION, "files": new_manifest}, ensure_ascii=False)
+    )
+    print(f"✅ 검색 인덱스 갱신 완료 ({len(index_data)}개 기업, 새로 파싱 {parsed_count}개)")
+
+    # 3. 사이트맵: 홈, 기업이 있는 허브, 기업 페이지 순서로 기록
+    sitemap = SitemapWriter(SITEMAP_DIR, SITEMAP_PATH)
+    today = datetime.now().strftime('%Y-%m-%d')
+    sitemap.add(f"{DOMAIN}/", changefreq="daily", priority="1.0")
+    for path, priority in iter_hub_sitemap_paths(index_data):
+        sitemap.add(f"{DOMAIN}{path}", lastmod=today, changefreq="daily", priority=priority)
+    hub_url_count = sitemap.url_count
+    for file_slug, mtime in company_pages:
+        lastmod = datetime.fromtimestamp(mtime).strftime('%Y-%m-%d')
+        sitemap.add(f"{DOMAIN}/company/{file_slug}", lastmod=lastmod, changefreq="weekly", priority="0.8")
+    sitemap.close()
+    print(f"✅ 사이트맵 생성 완료 ({sitemap.url_count - hub_url_count}개 기업 + 허브 {hub_url_count}개 링크, 샤드 {len(sitemap.shards)}개) -> {SITEMAP_PATH}")
+
+
+def render_reports():
+    """(Render Task) 모든 .md 리포트를 HTML 조각 + 메타데이터로 미리 변환합니다. (멀티프로세싱, 증분)"""
+    if not os.path.exists(CONTENT_DIR):
+        print(f"⚠️ 콘텐츠 폴더가 없습니다: {CONTENT_DIR}")
+        return
+
+    os.makedirs(RENDERED_DIR, exist_ok=True)
+    manifest = {}
+    if os.path.exists(RENDER_MANIFEST_PATH):
+        with open(RENDER_MANIFEST_PATH, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+    new_manifest = {}
+    targets = []
+    for filename in os.listdir(CONTENT_DIR):
+        if not filename.endswith('.md'):
+            continue
+        file_path = os.path.join(CONTENT_DIR, filename)
+        st = os.stat(file_path)
+        entry = manifest.get(filename)
+        html_exists = os.path.exists(os.path.join(RENDERED_DIR, filename[:-3] + ".html"))
+
+        # 1. mtime/size 가 같으면 파일을 열지 않고 건너뜀
+        if entry and html_exists and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+            new_manifest[filename] = entry
+            continue
+
+        # 2. mtime 만 바뀌고 내용(해시)이 같으면 재변환하지 않음 (사이드카의 mtime 만 갱신 필요)
+        if entry and html_exists:
+            with open(file_path, 'rb') as f:
+                digest = hashlib.sha1(f.read()).hexdigest()
+            if digest == entry["sha1"] and touch_sidecar(filename, st.st_mtime_ns):
+                new_manifest[filename] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha1": digest}
+                continue
+
+        targets.append(file_path)
+
+    # 삭제된 원본의 조각 정리
+    for filename in set(manifest) - set(new_manifest) - {os.path.basename(t) for t in targets}:
+        for ext in (".html", ".json"):
+            stale_path = os.path.join(RENDERED_DIR, filename[:-3] + ext)
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+
+    print(f"\n🧩 변환 대상 {len(targets)}개 (변경 없음 {len(new_manifest)}개)")
+
+    if targets:
+        with concurrent.futures.ProcessPoolExecutor() as executor:
+            futures = {executor.submit(prerender_report, t, RENDERED_DIR): t for t in targets}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    filename, mtime_ns, size, digest = future.result()
+                    new_manifest[filename] = {"mtime_ns": mtime_ns, "size": size, "sha1": digest}
+                except Exception as e:
+                    print(f"⚠️ {os.path.basename(futures[future])} 변환 중 오류: {e}")
+
+    write_atomic(RENDER_MANIFEST_PATH, json.dumps(new_manifest, ensure_ascii=False))
+    print(f"✅ 리포트 사전 변환 완료 ({len(new_manifest)}개) -> {RENDERED_DIR}")
+
+def touch_sidecar(filename, mtime_ns):
+    """내용이 같은 리포트의 사이드카에 새 원본 mtime 을 기록합니다. 실패하면 False."""
+    meta_path = os.path.join(RENDERED_DIR, filename[:-3] + ".json")
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            sidecar = json.load(f)
+    except (OSError, ValueError):
+        return False
+    sidecar["source_mtime_ns"] = mtime_ns
+    write_atomic(meta_path, json.dumps(sidecar, ensure_ascii=False, default=str))
+    return True
+
+def file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def export_site(full=False):
+    """(Export Task) /search 를 제외한 모든 페이지를 EXPORT_DIR 에 HTML 파일로 내보냅니다. (멀티프로세싱, 증분)
+
+    홈/정적 페이지/허브는 인덱스 버전과 템플릿 버전, 상세 페이지는 원본 mtime/size 와 템플릿 버전이
+    지난 내보내기와 같으면 건너뜁니다. 정적 파일, 사이트맵, robots.txt 도 함께 복사하므로
+    결과 폴더를 그대로 CDN/웹 서버에 올리고 /search 만 앱으로 보내면 됩니다.
+    """
+    snapshot = IndexStore(INDEX_PATH, bin_path=INDEX_BIN_PATH).reload(force=True)
+    template_version = get_template_version(TEMPLATE_DIR)
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+
+    manifest = {}
+    if not full and os.path.exists(EXPORT_MANIFEST_PATH):
+        with open(EXPORT_MANIFEST_PATH, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    new_manifest = {}
+
+    def is_fresh(rel_path, signature):
+        new_manifest[rel_path] = signature
+        return manifest.get(rel_path) == signature and os.path.exists(os.path.join(EXPORT_DIR, rel_path))
+
+    print(f"\n📤 정적 사이트 내보내기를 시작합니다... ({'전체' if full else '증분'} 모드) -> {EXPORT_DIR}")
+
+    # 1. 홈, 정적 페이지, 허브 (수가 적으므로 현재 프로세스에서 렌더링)
+    # 인덱스는 내용이 같아도 index 실행마다 다시 쓰이므로 mtime 대신 내용 해시로 변경 여부 판단
+    index_digest = file_sha1(snapshot.signature[2]) if snapshot.signature else ""
+    index_signature = f"{index_digest}:{template_version}"
+    page_count = 0
+    pages = [("/", "index.html", home_context(snapshot), f"{index_signature}:{snapshot.last_updated}")]
+    pages += [(f"/{name}", f"{name}.html", {}, str(template_version)) for name in STATIC_PAGES]
+    pages += [
+        (path, "hub.html", context, index_signature) for path, context in iter_hub_pages(snapshot)
+    ]
+    for path, template_name, context, signature in pages:
+        file_path = export_path(EXPORT_DIR, path)
+        if not is_fresh(os.path.relpath(file_path, EXPORT_DIR), signature):
+            write_page(file_path, render_page(template_name, path, context))
+            page_count += 1
+
+    # 2. 상세 페이지 (변경된 것만, 청크 단위로 프로세스 풀에서 렌더링)
+    targets = []
+    for company in snapshot.records:
+        md_path = os.path.join(CONTENT_DIR, f"{company.file}.md")
+        try:
+            st = os.stat(md_path)
+        except OSError:
+            print(f"⚠️ {company.file}.md 가 없어 건너뜁니다")
+            continue
+        rel_path = os.path.relpath(export_path(EXPORT_DIR, f"/company/{company.file}"), EXPORT_DIR)
+        if not is_fresh(rel_path, f"{st.st_mtime_ns}-{st.st_size}:{template_version}"):
+            targets.append((company.file, md_path))
+
+    chunks = [targets[i:i + SCAN_CHUNK_SIZE] for i in range(0, len(targets), SCAN_CHUNK_SIZE)]
+    if len(chunks) > 1 and (os.cpu_count() or 1) > 1:
+        with concurrent.futures.ProcessPoolExecutor() as executor:
+            results = list(executor.map(export_company_pages, chunks, [EXPORT_DIR] * len(chunks)))
+    else:
+        results = [export_company_pages(chunk, EXPORT_DIR) for chunk in chunks]
+    for file_id, error in (e for errors in results for e in errors):
+        print(f"⚠️ {file_id} 내보내기 중 오류: {error}")
+        # 이전에 내보낸 파일은 유지하고, 다음 실행에서 다시 시도하도록 서명을 비움
+        new_manifest[os.path.relpath(export_path(EXPORT_DIR, f"/company/{file_id}"), EXPORT_DIR)] = None
+
+    # 3. 정적 파일(/static/...), 사이트맵(루트), robots.txt
+    # 사이트맵은 index 실행마다 다시 쓰이므로 내용 해시로 비교하고, SITEMAP_DIR 이 STATIC_DIR 이어도
+    # /static/ 아래에는 복사하지 않음 (루트 경로로만 제공)
+    sitemap_files = sorted(glob.glob(os.path.join(SITEMAP_DIR, "sitemap*.xml*")))
+    skip = {os.path.abspath(src) for src in sitemap_files}
+    copies = []
+    for dirpath, _, filenames in os.walk(STATIC_DIR):
+        for filename in filenames:
+            src = os.path.join(dirpath, filename)
+            if os.path.abspath(src) not in skip:
+                copies.append((src, os.path.join("static", os.path.relpath(src, STATIC_DIR)), False))
+    for src in sitemap_files:
+        copies.append((src, os.path.basename(src), True))
+    ads_path = os.path.join(STATIC_DIR, "ads.txt")
+    if os.path.exists(ads_path):
+        copies.append((ads_path, "ads.txt", False))
+    copy_count = 0
+    for src, rel_path, by_content in copies:
+        st = os.stat(src)
+        signature = file_sha1(src) if by_content else f"{st.st_mtime_ns}-{st.st_size}"
+        if not is_fresh(rel_path, signature):
+            dst = os.path.join(EXPORT_DIR, rel_path)
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            shutil.copy2(src, dst)
+            copy_count += 1
+    if not is_fresh("robots.txt", ROBOTS_TXT):
+        write_atomic(os.path.join(EXPORT_DIR, "robots.txt"), ROBOTS_TXT)
+
+    # 4. 더 이상 없는 페이지/파일 정리 (삭제된 기업, 이전 사이트맵 샤드 등)
+    removed = 0
+    for rel_path in set(manifest) - set(new_manifest):
+        stale_path = os.path.join(EXPORT_DIR, rel_path)
+        if os.path.exists(stale_path):
+            os.remove(stale_path)
+            removed += 1
+
+    write_atomic(EXPORT_MANIFEST_PATH, json.dumps(new_manifest, ensure_ascii=False))
+    print(f"✅ 내보내기 완료: 페이지 {page_count + len(targets)}개 렌더링, 파일 {copy_count}개 복사, "
+          f"{removed}개 삭제 (전체 {len(new_manifest)}개)")
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="CompanyDB 콘텐츠 관리 스크립트")
-    parser.add_argument("command", choices=["daily", "migrate", "rebuild", "index"], help="실행할 작업을 선택합니다.")
+    parser.add_argument("command", choices=["daily", "migrate", "rebuild", "index", "render", "reparse", "export"], help="실행할 작업을 선택합니다.")
+    parser.add_argument("--full", action="store_true", help="매니페스트를 무시하고 모든 파일을 다시 인덱싱/내보내기합니다.")
+    parser.add_argument("--priority", help="새 기업 선정 시 값이 큰 순으로 우선할 CSV 컬럼 (예: subsidy_count). 기본은 CSV 순서.")
+    parser.add_argument("--fake", action="store_true", help="Gemini 대신 로컬 가짜 모델 클라이언트를 사용합니다. (개발/테스트용, COMPANYDB_CONTENT_DIR/DATA_DIR/SITEMAP_DIR 로 임시 폴더 지정 필요)")
+    parser.add_argument("--no-cache", action="store_true", help="모델 응답 캐시를 사용하지 않고 항상 API 를 호출합니다.")
+    parser.add_argument("--batch-size", type=int, default=MIGRATION_BATCH_SIZE, help=f"카테고리 마이그레이션 배치 크기 (1 이면 개별 요청, 기본 {MIGRATION_BATCH_SIZE})")
+    parser.add_argument("--kind", choices=sorted(RESPONSE_HANDLERS), help="reparse 할 응답 종류 (기본: 전체)")
     
     args = parser.parse_args()
     
@@ -325,18 +949,38 @@ if __name__ == "__main__":
     print(f"  CompanyDB 콘텐츠 관리: '{args.command}' 작업 시작")
     print("="*40)
 
+    if args.fake and args.command in ("daily", "migrate", "rebuild", "reparse"):
+        conflicts = get_fake_output_conflicts()
+        if conflicts:
+            print(f"❌ --fake 는 실제 콘텐츠/데이터 폴더에 쓸 수 없습니다. 임시 폴더를 지정하세요: {', '.join(conflicts)}")
+            sys.exit(1)
+
+    # 리포트를 만들거나 고치는 작업 뒤에는 상세 페이지 조각도 증분 사전 변환 (변경된 것만)
     if args.command == "daily":
-        generate_new_content()
-        update_index_and_sitemap()
+        generate_new_content(fake=args.fake, priority=args.priority, use_cache=not args.no_cache)
+        update_index_and_sitemap(full=args.full)
+        render_reports()
     elif args.command == "migrate":
-        migrate_missing_categories()
-        update_index_and_sitemap()
+        migrate_missing_categories(fake=args.fake, use_cache=not args.no_cache, batch_size=args.batch_size)
+        update_index_and_sitemap(full=args.full)
+        render_reports()
     elif args.command == "rebuild":
-        generate_new_content()
-        migrate_missing_categories()
-        update_index_and_sitemap()
+        generate_new_content(fake=args.fake, priority=args.priority, use_cache=not args.no_cache)
+        migrate_missing_categories(fake=args.fake, use_cache=not args.no_cache, batch_size=args.batch_size)
+        update_index_and_sitemap(full=args.full)
+        render_reports()
     elif args.command == "index":
+        update_index_and_sitemap(full=args.full)
+    elif args.command == "render":
+        render_reports()
+    elif args.command == "reparse":
+        reparse_cached_responses(fake=args.fake, kind=args.kind)
+        update_index_and_sitemap(full=args.full)
+        render_reports()
+    elif args.command == "export":
         update_index_and_sitemap()
+        render_reports()
+        export_site(full=args.full)
 
     print("\n🎉 모든 작업이 성공적으로 완료되었습니다!")
     print("="*40)
\ No newline at end of file
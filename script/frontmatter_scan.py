@@ -0,0 +1,67 @@
+"""마크다운 리포트의 frontmatter 헤더 병렬 스캔.
+
+본문(수천 자)은 읽지 않고 첫 `---` 부터 닫는 `---` 까지만 읽어 YAML 을 파싱합니다.
+YAML 파싱은 CPU 를 쓰므로 파일 목록을 청크로 나눠 프로세스 풀에서 처리하며,
+결과는 입력 순서 그대로 반환합니다.
+"""
+import os
+import re
+import concurrent.futures
+
+import frontmatter
+
+# 헤더 파싱 규칙 버전. read_header 가 돌려주는 메타데이터가 바뀌면 올릴 것 (인덱스 매니페스트 무효화)
+HEADER_SCAN_VERSION = 1
+
+# python-frontmatter 의 YAML 구분선과 같은 규칙
+BOUNDARY_RE = re.compile(r'^-{3,}\s*$')
+
+
+def read_header(file_path):
+    """파일 앞부분의 frontmatter 블록만 읽어 메타데이터 dict 를 반환합니다."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        first = f.readline()
+        # frontmatter.load 는 앞뒤 공백을 제거한 뒤 파싱하므로 앞쪽 빈 줄은 건너뜀
+        while first and not first.strip():
+            first = f.readline()
+        first = first.lstrip()
+        if not BOUNDARY_RE.match(first):
+            return {}
+
+        # 닫는 구분선까지 읽음 (없으면 파일 끝까지 읽어 frontmatter.load 와 같은 결과)
+        lines = [first]
+        for line in f:
+            lines.append(line)
+            if BOUNDARY_RE.match(line):
+                break
+    return frontmatter.loads(''.join(lines)).metadata
+
+
+def scan_chunk(file_paths):
+    """[(메타데이터 또는 None, 오류 메시지 또는 None)] - 프로세스 풀 작업 단위."""
+    results = []
+    for file_path in file_paths:
+        try:
+            results.append((read_header(file_path), None))
+        except Exception as e:
+            results.append((None, str(e)))
+    return results
+
+
+def scan_headers(file_paths, chunk_size=256, workers=None):
+    """여러 파일의 frontmatter 를 병렬로 읽어 입력과 같은 순서의 (메타데이터, 오류) 목록을 반환합니다.
+
+    파일이 한 청크 이하이거나 CPU 가 하나뿐이면 프로세스를 띄우지 않고 현재 프로세스에서 처리합니다.
+    """
+    file_paths = list(file_paths)
+    chunks = [file_paths[i:i + chunk_size] for i in range(0, len(file_paths), chunk_size)]
+    workers = min(len(chunks), workers or os.cpu_count() or 1)
+    if workers <= 1:
+        return scan_chunk(file_paths)
+
+    results = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        # map 은 제출 순서대로 결과를 돌려주므로 출력 순서가 항상 같음
+        for chunk_results in executor.map(scan_chunk, chunks):
+            results.extend(chunk_results)
+    return results
@@ -0,0 +1,273 @@
+"""AI 콘텐츠 생성용 비동기 파이프라인.
+
+토큰 버킷 속도 제한, 오류/지연에 반응하는 적응형 동시성, 지터가 섞인 지수 백오프 재시도,
+중단된 실행을 이어서 처리하기 위한 작업 저널을 제공합니다.
+모델 클라이언트는 `async generate(prompt) -> str` 만 구현하면 되므로,
+google.generativeai 없이 FakeModelClient 로 로컬에서 전체 흐름을 시험할 수 있습니다.
+"""
+import os
+import json
+import time
+import random
+import asyncio
+
+
+# --- 모델 클라이언트 ---
+
+class TransientModelError(Exception):
+    """재시도하면 성공할 수 있는 오류 (429, 5xx 등)."""
+
+    def __init__(self, message, code=429):
+        super().__init__(message)
+        self.code = code
+
+
+class GeminiClient:
+    """google.generativeai 비동기 호출 래퍼. (패키지는 실제로 사용할 때만 import)"""
+
+    def __init__(self, model_name, api_key=None):
+        import google.generativeai as genai
+        genai.configure(api_key=api_key or os.getenv("GEMINI_API_KEY"))
+        self.model_name = model_name
+        self._model = genai.GenerativeModel(model_name)
+
+    async def generate(self, prompt):
+        response = await self._model.generate_content_async(prompt)
+        return response.text
+
+
+class FakeModelClient:
+    """개발/테스트용 로컬 가짜 모델. API 호출 없이 정해진 형식의 응답을 돌려줍니다.
+
+    latency 초만큼 기다린 뒤 응답하며, failure_rate 확률로 TransientModelError(429)를 냅니다.
+    responder(prompt) 를 넘기면 그 반환값을 응답으로 사용합니다.
+    """
+
+    model_name = "fake-model"
+
+    def __init__(self, responder=None, latency=0.05, failure_rate=0.0, seed=None):
+        self.responder = responder
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    async def generate(self, prompt):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self._random.random() < self.failure_rate:
+            raise TransientModelError("fake rate limit", code=429)
+        if self.responder is not None:
+            return self.responder(prompt)
+        return (
+            "Fake Company Co., Ltd.\n"
+            "Category: Services\n"
+            "---BODY---\n"
+            "> **Analyst's Executive Summary**: Generated locally without calling the API.\n\n"
+            "## Company Overview\n\nPlaceholder report body."
+        )
+
+
+def is_retryable(exc):
+    """속도 제한, 일시적 서버 오류, 시간 초과이면 True."""
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, ConnectionError, TransientModelError)):
+        return True
+    # google.api_core.exceptions 를 import 하지 않고 이름/코드로 판별
+    if type(exc).__name__ in {"ResourceExhausted", "TooManyRequests", "ServiceUnavailable",
+                              "DeadlineExceeded", "InternalServerError", "GatewayTimeout"}:
+        return True
+    return getattr(exc, "code", None) in (429, 500, 502, 503, 504)
+
+
+def is_throttle(exc):
+    return type(exc).__name__ in {"ResourceExhausted", "TooManyRequests"} or getattr(exc, "code", None) == 429
+
+
+# --- 흐름 제어 ---
+
+class TokenBucket:
+    """초당 rate 개의 토큰이 채워지는 버킷. 호출 전 acquire() 로 토큰 하나를 소비합니다."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class AdaptiveConcurrency:
+    """AIMD 방식의 동시 실행 한도.
+
+    성공하고 지연이 목표 이하이면 한도를 천천히 올리고(가산 증가),
+    속도 제한 오류나 목표를 크게 넘는 지연이 나오면 절반으로 줄입니다(곱셈 감소).
+    """
+
+    def __init__(self, initial, minimum, maximum, target_latency):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.in_flight = 0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self, latency=None, throttled=False, failed=False):
+        async with self._cond:
+            self.in_flight -= 1
+            if throttled or (latency is not None and latency > 2 * self.target_latency):
+                self.limit = max(self.minimum, self.limit / 2)
+            elif failed:
+                self.limit = max(self.minimum, self.limit - 1)
+            elif latency is not None and latency <= self.target_latency:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+
+def backoff_delay(attempt, base, cap):
+    """full jitter 지수 백오프: [0, min(cap, base * 2^attempt)] 구간의 무작위 지연."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+# --- 작업 저널 ---
+
+class JobJournal:
+    """실행 단위 작업 목록과 완료/실패 기록을 JSON Lines 로 남기는 저널.
+
+    첫 줄에 이번 실행의 대상 id 목록을 기록하고, 이후 작업이 끝날 때마다 한 줄씩 추가합니다.
+    실행이 중단되면 다음 실행에서 같은 대상 중 끝나지 않은 작업만 이어서 처리하며,
+    max_attempts 번의 실행에서 모두 실패한 작업은 포기합니다.
+    더 처리할 작업이 없으면 저널 파일을 삭제합니다.
+    """
+
+    def __init__(self, path, max_attempts=2):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.targets = []
+        self.done = set()
+        self.failed = {}  # id -> 실패한 실행 횟수
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # 중단 시 마지막 줄이 잘렸을 수 있음
+                    continue
+                if entry["type"] == "run":
+                    self.targets = entry["targets"]
+                elif entry["type"] == "done":
+                    self.done.add(entry["id"])
+                    self.failed.pop(entry["id"], None)
+                elif entry["type"] == "failed":
+                    self.failed[entry["id"]] = self.failed.get(entry["id"], 0) + 1
+
+    def pending(self):
+        """이전 실행에서 끝나지 않은 대상 id 목록 (없으면 빈 목록)."""
+        return [
+            t for t in self.targets
+            if t not in self.done and self.failed.get(t, 0) < self.max_attempts
+        ]
+
+    def start(self, targets):
+        self.targets = list(targets)
+        self.done = set()
+        self.failed = {}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({"type": "run", "ts": time.time(), "targets": self.targets}) + "\n")
+
+    def _append(self, entry):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+
+    def mark_done(self, job_id):
+        self.done.add(job_id)
+        self.failed.pop(job_id, None)
+        self._append({"type": "done", "id": job_id, "ts": time.time()})
+
+    def mark_failed(self, job_id, error):
+        self.failed[job_id] = self.failed.get(job_id, 0) + 1
+        self._append({"type": "failed", "id": job_id, "error": str(error), "ts": time.time()})
+
+    def finish(self):
+        """더 처리할 대상이 없으면 저널을 지웁니다. 재시도할 실패가 남아 있으면 다음 실행을 위해 유지."""
+        if not self.pending() and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+# --- 파이프라인 실행 ---
+
+async def run_pipeline(jobs, handler, client, rate, burst, concurrency, max_concurrency,
+                       min_concurrency=1, target_latency=20.0, max_retries=5,
+                       backoff_base=1.0, backoff_cap=60.0, timeout=120.0, journal=None,
+                       on_result=None):
+    """jobs 의 각 (job_id, payload) 에 대해 handler(client, payload) 코루틴을 실행합니다.
+
+    handler 는 모델을 호출하고 결과를 저장한 뒤 출력용 메시지를 반환해야 합니다.
+    on_result(index, total, ok, message) 로 진행 상황을 받습니다. 성공 개수를 반환합니다.
+    """
+    bucket = TokenBucket(rate, burst)
+    limiter = AdaptiveConcurrency(concurrency, min_concurrency, max_concurrency, target_latency)
+    total = len(jobs)
+    finished = 0
+    success_count = 0
+
+    async def run_one(job_id, payload):
+        nonlocal finished, success_count
+        last_error = None
+        for attempt in range(max_retries + 1):
+            await limiter.acquire()
+            await bucket.acquire()
+            started = time.monotonic()
+            try:
+                message = await asyncio.wait_for(handler(client, payload), timeout)
+            except Exception as e:
+                last_error = e
+                await limiter.release(throttled=is_throttle(e), failed=True)
+                if not is_retryable(e) or attempt == max_retries:
+                    break
+                await asyncio.sleep(backoff_delay(attempt, backoff_base, backoff_cap))
+                continue
+            await limiter.release(latency=time.monotonic() - started)
+
+            finished += 1
+            success_count += 1
+            if journal is not None:
+                journal.mark_done(job_id)
+            if on_result:
+                on_result(finished, total, True, message)
+            return
+
+        finished += 1
+        if journal is not None:
+            journal.mark_failed(job_id, last_error)
+        if on_result:
+            on_result(finished, total, False, f"❌ 에러 발생 ({job_id}): {last_error}")
+
+    await asyncio.gather(*(run_one(job_id, payload) for job_id, payload in jobs))
+    if journal is not None:
+        journal.finish()
+    return success_count
@@ -0,0 +1,112 @@
+"""모델 응답 디스크 캐시 (SQLite).
+
+키는 모델 이름 + 프롬프트의 SHA-256 이며, 같은 입력을 다시 보내는 재실행/rebuild/마이그레이션에서
+API 를 호출하지 않고 저장된 응답을 사용합니다. 응답과 함께 작업 종류(kind)와 작업 데이터(payload)를
+저장해 두므로, 응답 파싱 로직이 바뀌었을 때 API 호출 없이 다시 적용(reparse)할 수 있습니다.
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+
+
+class ResponseCache:
+    """TTL 과 전체 크기 상한으로 정리되는 프롬프트-응답 캐시."""
+
+    def __init__(self, path, ttl=None, max_bytes=None):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                kind TEXT,
+                job_id TEXT,
+                payload TEXT,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self._db.commit()
+
+    @staticmethod
+    def make_key(model, prompt):
+        return hashlib.sha256(f"{model}\0{prompt}".encode('utf-8')).hexdigest()
+
+    def _expired_before(self):
+        return time.time() - self.ttl if self.ttl else None
+
+    def get(self, model, prompt):
+        """저장된 응답을 반환합니다. 없거나 TTL 이 지났으면 None."""
+        key = self.make_key(model, prompt)
+        row = self._db.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+        expired_before = self._expired_before()
+        if row is None or (expired_before is not None and row[1] < expired_before):
+            self.misses += 1
+            return None
+        self._db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+        self._db.commit()
+        self.hits += 1
+        return row[0]
+
+    def put(self, model, prompt, response, kind=None, job_id=None, payload=None):
+        now = time.time()
+        payload_json = json.dumps(payload, ensure_ascii=False) if payload is not None else None
+        size = len(response.encode('utf-8')) + len((payload_json or "").encode('utf-8'))
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses (key, model, kind, job_id, payload, response, size, created, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (self.make_key(model, prompt), model, kind, job_id, payload_json, response, size, now, now),
+        )
+        self._db.commit()
+
+    def entries(self, model, kind):
+        """job_id 별 가장 최근 응답의 (job_id, payload, response) 목록 (reparse 용)."""
+        latest = {}
+        expired_before = self._expired_before() or 0
+        rows = self._db.execute(
+            "SELECT job_id, payload, response FROM responses "
+            "WHERE model = ? AND kind = ? AND created >= ? ORDER BY created",
+            (model, kind, expired_before),
+        )
+        for job_id, payload, response in rows:
+            latest[job_id] = (job_id, json.loads(payload) if payload else None, response)
+        return list(latest.values())
+
+    def evict(self):
+        """TTL 이 지난 항목을 지우고, 크기 상한을 넘으면 오래 쓰지 않은 항목부터 지웁니다."""
+        removed = 0
+        expired_before = self._expired_before()
+        if expired_before is not None:
+            removed += self._db.execute("DELETE FROM responses WHERE created < ?", (expired_before,)).rowcount
+
+        if self.max_bytes:
+            (total,) = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+            if total > self.max_bytes:
+                keys = []
+                for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY last_used"):
+                    if total <= self.max_bytes:
+                        break
+                    keys.append((key,))
+                    total -= size
+                self._db.executemany("DELETE FROM responses WHERE key = ?", keys)
+                removed += len(keys)
+        self._db.commit()
+        return removed
+
+    def stats(self):
+        count, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"entries": count, "bytes": total, "hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        self._db.close()